@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import json
+import os
+from typing import TYPE_CHECKING
+
+from enigma_simulator.engine import CompiledEnigma
+from enigma_simulator.engine import ProcessEnigma
+from enigma_simulator.engine import TableEnigma
+
+if TYPE_CHECKING:  # pragma: no cover
+    from enigma_simulator.enigma import Enigma
+
+BACKENDS = ("auto", "matrix", "table", "vectorized", "process")
+ENGINES: dict[str, type[CompiledEnigma]] = {
+    "table": TableEnigma,
+    "vectorized": CompiledEnigma,
+    "process": ProcessEnigma,
+}
+THRESHOLDS_ENV_VAR = "ENIGMA_SIMULATOR_THRESHOLDS"
+
+# Number of characters from which each backend wins, as measured by
+# python -m enigma_simulator.benchmark.
+DEFAULT_THRESHOLDS = {"vectorized": 1024, "process": 1 << 22}
+THRESHOLDS = dict(DEFAULT_THRESHOLDS)
+
+
+def load_thresholds(file_path: str) -> None:
+    with open(file_path, "r") as f:
+        THRESHOLDS.update(json.load(f))
+
+
+def select_backend(length: int, batch_size: int = 1) -> str:
+    if length * batch_size >= THRESHOLDS["process"] and ProcessEnigma.workers > 1:
+        return "process"
+    elif length >= THRESHOLDS["vectorized"]:
+        return "vectorized"
+    else:
+        return "table"
+
+
+def compile_enigma(enigma: Enigma, backend: str) -> CompiledEnigma:
+    try:
+        return ENGINES[backend].from_enigma(enigma)
+    except KeyError:
+        raise ValueError(
+            f"Backend {backend!r} can't be compiled. Should be one of: "
+            f"{', '.join(ENGINES)}."
+        )
+
+
+if os.environ.get(THRESHOLDS_ENV_VAR):  # pragma: no cover
+    load_thresholds(os.environ[THRESHOLDS_ENV_VAR])
@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import copy
+import itertools
+import json
+import os
+from concurrent.futures import Executor
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Any
+from typing import Iterable
+from typing import IO
+from typing import Tuple
+
+from enigma_simulator import metrics
+from enigma_simulator import output
+from enigma_simulator.backends import ENGINES
+from enigma_simulator.backends import select_backend
+from enigma_simulator.engine import CompiledEnigma
+from enigma_simulator.enigma import decrypt_transmission
+from enigma_simulator.enigma import encrypt_transmission
+from enigma_simulator.key import EnigmaKey
+from enigma_simulator.key import load_key
+from enigma_simulator.registry import REGISTRY
+
+WINDOW_SIZE = 1024
+KEY_FIELDS = ("rotor_names", "ring_settings", "reflector_type", "plugboard_connections")
+
+# (rotor_names, ring_settings, reflector_type, plugboard_connections), hashable so
+# workers can cache compiled machines by it.
+KeySettings = Tuple[Tuple[str, ...], Tuple[int, ...], str, str]
+
+
+def _key_settings(key: EnigmaKey) -> KeySettings:
+    return (
+        tuple(key.rotor_names),
+        tuple(key.ring_settings),
+        key.reflector_type,
+        key.plugboard_connections,
+    )
+
+
+class KeyCache:
+    def __init__(self) -> None:
+        self._keys: dict[str, KeySettings | Exception] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def resolve(self, job: dict[str, Any]) -> KeySettings:
+        key = job.get("key", {k: job[k] for k in KEY_FIELDS if k in job})
+        cache_key = json.dumps(key, sort_keys=True)
+
+        if cache_key not in self._keys:
+            try:
+                if isinstance(key, str):
+                    self._keys[cache_key] = _key_settings(load_key(key))
+                else:
+                    self._keys[cache_key] = _key_settings(EnigmaKey.parse_obj(key))
+            except Exception as e:
+                self._keys[cache_key] = e
+
+        result = self._keys[cache_key]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+@lru_cache(maxsize=256)
+def _compile(settings: KeySettings, backend: str, version: int) -> CompiledEnigma:
+    return ENGINES[backend].from_settings(*settings)
+
+
+def _compiled(settings: KeySettings, backend: str) -> CompiledEnigma:
+    misses = _compile.cache_info().misses
+    machine = _compile(settings, backend, REGISTRY.version)
+    hit = _compile.cache_info().misses == misses
+    metrics.increment("cache.compiled.hit" if hit else "cache.compiled.miss")
+    return machine
+
+
+def _error(job: Any, e: Exception) -> dict[str, Any]:
+    result = {"id": job["id"]} if isinstance(job, dict) and "id" in job else {}
+    result["error"] = str(e)
+    return result
+
+
+def run_job(machine: CompiledEnigma, job: dict[str, Any]) -> dict[str, Any]:
+    mode = job.get("mode", "message")
+    text = job.get("text", "")
+    result: dict[str, Any] = {"id": job["id"]} if "id" in job else {}
+
+    if mode == "message":
+        machine.update_rotor_positions(job.get("positions", "AAA"))
+        result["text"] = machine.encrypt(text)
+    elif mode == "transmission" and job.get("encrypt", True):
+        positions, message_key, encrypted = encrypt_transmission(
+            machine, text, job.get("positions"), job.get("message_key")
+        )
+        result.update(positions=positions, message_key=message_key, text=encrypted)
+    elif mode == "transmission":
+        result["text"] = decrypt_transmission(
+            machine, job["positions"], job["message_key"], text
+        )
+    else:
+        raise ValueError(f"Unknown mode {mode!r}.")
+
+    return result
+
+
+def run_group(
+    settings: KeySettings, jobs: list[dict[str, Any]], backend: str = "auto"
+) -> list[dict[str, Any]]:
+    results = []
+    for job in jobs:
+        try:
+            job_backend = backend
+            if job_backend == "auto":
+                job_backend = select_backend(len(job.get("text", "")))
+            if job_backend == "process":
+                # Jobs are already spread over the pool, so they aren't split again.
+                job_backend = "vectorized"
+
+            machine = copy.copy(_compiled(settings, job_backend))
+            results.append(run_job(machine, job))
+        except Exception as e:
+            results.append(_error(job, e))
+
+    return results
+
+
+def _run_window(
+    lines: list[str],
+    keys: KeyCache,
+    executor: Executor | None,
+    chunk_size: int,
+    backend: str,
+) -> list[dict[str, Any]]:
+    results: list[dict[str, Any]] = [{} for _ in lines]
+    groups: dict[KeySettings, list[int]] = {}
+    jobs: list[dict[str, Any]] = []
+
+    for i, line in enumerate(lines):
+        job = None
+        try:
+            job = json.loads(line)
+            jobs.append(job)
+            groups.setdefault(keys.resolve(job), []).append(i)
+        except Exception as e:
+            if len(jobs) == i:
+                jobs.append({})
+            results[i] = _error(job, e)
+
+    # Large groups are split so a window with a single key still uses every worker.
+    tasks = [
+        (settings, indices[start : start + chunk_size])
+        for settings, indices in groups.items()
+        for start in range(0, len(indices), chunk_size)
+    ]
+
+    if executor is None:
+        group_results = [
+            run_group(settings, [jobs[i] for i in indices], backend)
+            for settings, indices in tasks
+        ]
+    else:
+        futures = [
+            executor.submit(run_group, settings, [jobs[i] for i in indices], backend)
+            for settings, indices in tasks
+        ]
+        group_results = [f.result() for f in futures]
+
+    for (_, indices), group_result in zip(tasks, group_results):
+        for i, result in zip(indices, group_result):
+            results[i] = result
+
+    return results
+
+
+def run_batch(
+    lines: Iterable[str],
+    stream: IO[bytes],
+    workers: int | None = None,
+    window_size: int = WINDOW_SIZE,
+    backend: str = "auto",
+) -> int:
+    keys = KeyCache()
+    # An explicit worker count always uses the pool; the default only does so for
+    # windows large enough to pay for it.
+    gated = workers is None
+    workers = workers or os.cpu_count() or 1
+    executor: ProcessPoolExecutor | None = None
+    chunk_size = max(1, window_size // (4 * workers))
+    lines = (line for line in lines if line.strip())
+    count = 0
+
+    try:
+        # Only one window of jobs is in flight at a time, which bounds memory and
+        # lets results be written in input order.
+        while True:
+            window = list(itertools.islice(lines, window_size))
+            if not window:
+                break
+
+            # Small windows are cheaper to run here than to ship to the pool.
+            characters = sum(len(line) for line in window)
+            use_pool = workers > 1 and (
+                not gated
+                or backend == "process"
+                or select_backend(characters // len(window), len(window)) == "process"
+            )
+            if use_pool and executor is None:
+                executor = ProcessPoolExecutor(workers)
+
+            job_backend = "auto" if backend == "process" else backend
+            results = _run_window(
+                window, keys, executor if use_pool else None, chunk_size, job_backend
+            )
+            output.write("".join(json.dumps(r) + "\n" for r in results), stream)
+            count += len(window)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    return count
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from typing import Sequence
+
+import numpy as np
+
+from enigma_simulator import output
+from enigma_simulator.backends import ENGINES
+from enigma_simulator.engine import ProcessEnigma
+
+LENGTHS = tuple(4 ** i for i in range(12))
+
+
+def time_backend(
+    backend: str, message: str, repeat: int = 3, max_seconds: float = 2.0
+) -> float:
+    engine = ENGINES[backend].from_settings(["I", "II", "III"], [0, 0, 0], "B", "AB")
+    best = float("inf")
+    deadline = time.perf_counter() + max_seconds
+
+    for _ in range(repeat):
+        engine.update_rotor_positions([0, 0, 0])
+        t0 = time.perf_counter()
+        engine.encrypt(message)
+        best = min(best, time.perf_counter() - t0)
+        if time.perf_counter() > deadline:
+            break
+
+    return best
+
+
+def _crossover(faster: list[float], slower: list[float], lengths: Sequence[int]) -> int:
+    # First length from which the faster backend keeps winning.
+    for i in range(len(lengths)):
+        if all(f < s for f, s in zip(faster[i:], slower[i:])):
+            return lengths[i]
+    return sys.maxsize
+
+
+def calibrate(
+    lengths: Sequence[int] = LENGTHS, seed: int = 0
+) -> tuple[dict[str, int], dict[str, list[float]]]:
+    rng = np.random.default_rng(seed)
+    letters = rng.integers(65, 91, size=max(lengths), dtype=np.uint8).tobytes()
+    timings: dict[str, list[float]] = {backend: [] for backend in ENGINES}
+
+    for length in lengths:
+        message = letters[:length].decode()
+        for backend in ENGINES:
+            if backend == "table" and length > 1 << 18:
+                timings[backend].append(float("inf"))
+            else:
+                timings[backend].append(time_backend(backend, message))
+
+    thresholds = {
+        "vectorized": _crossover(timings["vectorized"], timings["table"], lengths),
+        "process": _crossover(timings["process"], timings["vectorized"], lengths),
+    }
+    return thresholds, timings
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    argv = argv if argv is not None else sys.argv[1:]
+    parser = argparse.ArgumentParser(
+        prog="python -m enigma_simulator.benchmark",
+        description=(
+            "Time the compiled backends over a range of message lengths and print the "
+            "lengths from which 'auto' should switch backend."
+        ),
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=str,
+        help=(
+            "Write the thresholds to this json file, to be loaded through the "
+            "ENIGMA_SIMULATOR_THRESHOLDS environment variable."
+        ),
+    )
+    parser.add_argument(
+        "-v", "--verbose", action="store_true", help="Print the timings too."
+    )
+    args = parser.parse_args(argv)
+
+    # Pay for the process pool start-up before timing anything.
+    ProcessEnigma.executor()
+    thresholds, timings = calibrate()
+
+    if args.verbose:
+        for i, length in enumerate(LENGTHS):
+            output.write_line(
+                f"{length:>9} "
+                + " ".join(f"{b}={timings[b][i] * 1e3:.3f}ms" for b in ENGINES)
+            )
+    output.write_line(json.dumps(thresholds))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(thresholds, f)
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
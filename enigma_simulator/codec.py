@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import codecs
+import copy
+from typing import Any
+from typing import TypeVar
+
+import numpy as np
+
+from enigma_simulator.engine import CompiledEnigma
+from enigma_simulator.engine import letter_mask
+from enigma_simulator.enigma import Enigma
+
+T = TypeVar("T")
+
+_MACHINES: dict[str, CompiledEnigma] = {}
+
+
+def _normalise(name: str) -> str:
+    return name.lower().replace("-", "_").replace(" ", "_")
+
+
+def _machine(name: str, keypresses: int = 0) -> CompiledEnigma:
+    try:
+        machine = copy.copy(_MACHINES[name])
+    except KeyError:
+        raise LookupError(f"No Enigma registered for the {name!r} codec.")
+
+    machine.positions = list(machine.positions)
+    if keypresses:
+        machine.step(keypresses)
+    return machine
+
+
+def _crypt(machine: CompiledEnigma, data: bytes) -> tuple[bytes, int]:
+    array = np.frombuffer(data, dtype=np.uint8)
+    _, mask = letter_mask(array)
+    return machine.encrypt_bytes(array).tobytes(), int(mask.sum())
+
+
+class IncrementalEncoder(codecs.IncrementalEncoder):
+    codec_name = "enigma"
+
+    def __init__(self, errors: str = "strict") -> None:
+        super().__init__(errors)
+        self.reset()
+
+    def encode(self, input: str, final: bool = False) -> bytes:
+        encrypted, keypresses = _crypt(self.machine, input.encode("ascii", self.errors))
+        self.keypresses += keypresses
+        return encrypted
+
+    def reset(self) -> None:
+        self.setstate(0)
+
+    def getstate(self) -> int:
+        return self.keypresses
+
+    def setstate(self, state: int) -> None:  # type: ignore
+        self.machine = _machine(self.codec_name, state)
+        self.keypresses = state
+
+
+class IncrementalDecoder(codecs.IncrementalDecoder):
+    codec_name = "enigma"
+
+    def __init__(self, errors: str = "strict") -> None:
+        super().__init__(errors)
+        self.reset()
+
+    def decode(self, input: Any, final: bool = False) -> str:
+        decrypted, keypresses = _crypt(self.machine, bytes(input))
+        self.keypresses += keypresses
+        return decrypted.decode("ascii", self.errors)
+
+    def reset(self) -> None:
+        self.setstate((b"", 0))
+
+    def getstate(self) -> tuple[bytes, int]:
+        return (b"", self.keypresses)
+
+    def setstate(self, state: tuple[bytes, int]) -> None:
+        self.machine = _machine(self.codec_name, state[1])
+        self.keypresses = state[1]
+
+
+class StreamWriter(codecs.StreamWriter):
+    codec_name = "enigma"
+
+    def encode(self, input: str, errors: str = "strict") -> tuple[bytes, int]:
+        if not hasattr(self, "encoder"):
+            self.encoder = _codec_class(IncrementalEncoder, self.codec_name)(errors)
+        return self.encoder.encode(input), len(input)
+
+    def reset(self) -> None:
+        super().reset()
+        if hasattr(self, "encoder"):
+            self.encoder.reset()
+
+
+class StreamReader(codecs.StreamReader):
+    codec_name = "enigma"
+
+    def decode(self, input: bytes, errors: str = "strict") -> tuple[str, int]:
+        if not hasattr(self, "decoder"):
+            self.decoder = _codec_class(IncrementalDecoder, self.codec_name)(errors)
+        return self.decoder.decode(input), len(input)
+
+    def reset(self) -> None:
+        super().reset()
+        if hasattr(self, "decoder"):
+            self.decoder.reset()
+
+
+def _codec_class(cls: type[T], name: str) -> type[T]:
+    return type(cls.__name__, (cls,), {"codec_name": name})
+
+
+def _codec_info(name: str) -> codecs.CodecInfo:
+    encoder = _codec_class(IncrementalEncoder, name)
+    decoder = _codec_class(IncrementalDecoder, name)
+
+    def encode(input: str, errors: str = "strict") -> tuple[bytes, int]:
+        return encoder(errors).encode(input, True), len(input)
+
+    def decode(input: Any, errors: str = "strict") -> tuple[str, int]:
+        return decoder(errors).decode(input, True), len(input)
+
+    return codecs.CodecInfo(
+        name=name,
+        encode=encode,
+        decode=decode,
+        incrementalencoder=encoder,
+        incrementaldecoder=decoder,
+        streamwriter=_codec_class(StreamWriter, name),
+        streamreader=_codec_class(StreamReader, name),
+    )
+
+
+def _search(name: str) -> codecs.CodecInfo | None:
+    name = _normalise(name)
+    return _codec_info(name) if name in _MACHINES else None
+
+
+def register(enigma: Enigma | CompiledEnigma, name: str = "enigma") -> None:
+    if isinstance(enigma, Enigma):
+        enigma = CompiledEnigma.from_enigma(enigma)
+
+    # Codec lookups are cached by the codecs module, so the machine is looked up by
+    # name whenever an encoder is created rather than captured in the CodecInfo.
+    template = copy.copy(enigma)
+    template.positions = list(enigma.positions)
+    _MACHINES[_normalise(name)] = template
+
+
+def unregister(name: str = "enigma") -> None:
+    _MACHINES.pop(_normalise(name), None)
+
+
+codecs.register(_search)
@@ -1,20 +1,16 @@
 from __future__ import annotations
 
 import re
-import sys
+from functools import lru_cache
 from typing import Callable
 
 import numpy as np
 from numpy.linalg import matrix_power
 
+from enigma_simulator.registry import REGISTRY
 from enigma_simulator.utils import char_to_int
 from enigma_simulator.utils import encoding_to_transform
 
-if sys.version_info >= (3, 8):  # pragma: no cover
-    from typing import TypedDict
-else:  # pragma: no cover
-    from typing_extensions import TypedDict
-
 
 WHITESPACE_REGEX = re.compile("[^a-zA-Z]")
 
@@ -41,6 +37,7 @@ class Rotor(Component):
         encoding: str,
         notch_positions: list[str],
         position: int | str,
+        transforms: np.ndarray | None = None,
     ) -> None:
         self.name = name
         self.ring_setting = ring_setting % 26
@@ -55,9 +52,12 @@ class Rotor(Component):
         self.notch_positions = [(char_to_int(i) - 1) % 26 for i in notch_positions]
 
         self.initial_encoding = encoding
-        generated_transforms = self.generate_transforms(
-            encoding_to_transform(encoding), self.ring_setting
-        )
+        if transforms is None:
+            generated_transforms = self.generate_transforms(
+                encoding_to_transform(encoding), self.ring_setting
+            )
+        else:
+            generated_transforms = list(transforms)
         self.transforms = {k: v for k, v in enumerate(generated_transforms)}
         self.transforms_t = {
             k: v.transpose() for k, v in enumerate(generated_transforms)
@@ -145,69 +145,30 @@ class Plugboard(Component):
         return transform
 
 
-def get_rotor(name: str, ring_setting: int, position: int) -> Rotor:
-    class RotorAttribute(TypedDict):
-        encoding: str
-        notch_positions: list[str]
-
-    rotor_setup: dict[str, RotorAttribute] = {
-        "I": {
-            "encoding": "EKMFLGDQVZNTOWYHXUSPAIBRCJ",
-            "notch_positions": ["R"],
-        },
-        "II": {
-            "encoding": "AJDKSIRUXBLHWTMCQGZNPYFVOE",
-            "notch_positions": ["F"],
-        },
-        "III": {
-            "encoding": "BDFHJLCPRTXVZNYEIWGAKMUSQO",
-            "notch_positions": ["W"],
-        },
-        "IV": {
-            "encoding": "ESOVPZJAYQUIRHXLNFTGKDCMWB",
-            "notch_positions": ["K"],
-        },
-        "V": {
-            "encoding": "VZBRGITYUPSDNHLXAWMJQOFECK",
-            "notch_positions": ["A"],
-        },
-        "VI": {
-            "encoding": "JPGVOUMFYQBENHZRDKASXLICTW",
-            "notch_positions": ["A", "N"],
-        },
-        "VII": {
-            "encoding": "NZJHGRCXMYSWBOUFAIVLPEKQDT",
-            "notch_positions": ["A", "N"],
-        },
-        "VIII": {
-            "encoding": "FKQHTLXOCBJSPDZRAMEWNIUYGV",
-            "notch_positions": ["A", "N"],
-        },
-    }
-
-    rotor_attrs: RotorAttribute = rotor_setup.get(
-        name,
-        {
-            "encoding": "ABCDEFGHIJKLMNOPQRSTUVWXYZ",
-            "notch_positions": ["A"],
-        },
-    )
+@lru_cache(maxsize=256)
+def _rotor_transforms(name: str, ring_setting: int, version: int) -> np.ndarray:
+    # One-hot matrices of the registry's compiled tables, one per position.
+    forward, _ = REGISTRY.rotor(name).tables(ring_setting)
+    positions, letters = np.indices((26, 26))
+    transforms = np.zeros((26, 26, 26), dtype=int)
+    transforms[positions, forward, letters] = 1
+    transforms.flags.writeable = False
+    return transforms
+
+
+def get_rotor(name: str, ring_setting: int, position: int | str) -> Rotor:
+    wiring = REGISTRY.rotor(name)
 
     return Rotor(
         name,
         ring_setting,
-        rotor_attrs["encoding"],
-        rotor_attrs["notch_positions"],
+        wiring.encoding,
+        wiring.notch_positions,
         position,
+        _rotor_transforms(name, ring_setting % 26, REGISTRY.version),
     )
 
 
 def get_reflector(reflector_type: str) -> Reflector:
-    if reflector_type == "A":
-        return Reflector("EJMZALYXVBWFCRQUONTSPIKHGD")
-    elif reflector_type == "B":
-        return Reflector("YRUHQSLDPXNGOKMIEBFZCWVJAT")
-    elif reflector_type == "C":
-        return Reflector("FVPJIAOYEDRZXWGCTKUQSBNMHL")
-    else:
-        return Reflector("ABCDEFGHIJKLMNOPQRSTUVWXYZ")
+    wiring = REGISTRY.reflector(reflector_type)
+    return Reflector(wiring.encoding)
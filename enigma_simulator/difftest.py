@@ -0,0 +1,270 @@
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from typing import Any
+from typing import Callable
+from typing import NamedTuple
+from typing import Sequence
+
+import numpy as np
+
+from enigma_simulator import output
+from enigma_simulator.engine import CompiledEnigma
+from enigma_simulator.engine import ProcessEnigma
+from enigma_simulator.engine import TableEnigma
+from enigma_simulator.enigma import Enigma
+from enigma_simulator.registry import REGISTRY
+from enigma_simulator.utils import int_to_char
+
+ALPHABET = np.array(
+    list("ABCDEFGHIJKLMNOPQRSTUVWXYZ abcdefghijklmnopqrstuvwxyz0123456789.,?:'-")
+)
+
+
+class SegmentedProcessEnigma(ProcessEnigma):
+    # Small enough that the random messages are split across workers.
+    segment_size = 16
+    workers = 2
+
+
+ENGINES: dict[str, Callable[[Enigma], Any]] = {
+    "table": TableEnigma.from_enigma,
+    "vectorized": CompiledEnigma.from_enigma,
+    "process": SegmentedProcessEnigma.from_enigma,
+}
+
+
+class Case(NamedTuple):
+    rotor_names: tuple[str, ...]
+    ring_settings: tuple[int, ...]
+    reflector_type: str
+    plugboard_connections: str
+    positions: tuple[int, ...]
+    message: str
+
+    def enigma(self) -> Enigma:
+        return Enigma(
+            list(self.rotor_names),
+            list(self.ring_settings),
+            self.reflector_type,
+            self.plugboard_connections,
+            list(self.positions),
+            backend="matrix",
+        )
+
+    def __str__(self) -> str:
+        return (
+            f"Enigma({list(self.rotor_names)}, {list(self.ring_settings)}, "
+            f"{self.reflector_type!r}, {self.plugboard_connections!r}, "
+            f"{list(self.positions)}).encrypt({self.message!r})"
+        )
+
+
+def random_case(rng: np.random.Generator, max_length: int = 200) -> Case:
+    rotor_names = tuple(
+        rng.choice(list(REGISTRY.rotors), size=3, replace=False).tolist()
+    )
+    positions = rng.integers(0, 26, size=3)
+
+    # Park the rotors just before their notches often enough to hit double steps and
+    # the second notch of rotors VI-VIII.
+    for i in (1, 2):
+        turnover_positions = REGISTRY.rotors[rotor_names[i]].turnover_positions
+        if turnover_positions and rng.random() < 0.5:
+            notch = rng.choice(turnover_positions)
+            positions[i] = (notch - rng.integers(0, 3)) % 26
+
+    letters = rng.permutation(26)
+    plugs = rng.integers(0, 14)
+    plugboard_connections = " ".join(
+        int_to_char(letters[2 * i]) + int_to_char(letters[2 * i + 1])
+        for i in range(plugs)
+    )
+
+    message = "".join(
+        ALPHABET[rng.integers(0, len(ALPHABET), size=rng.integers(0, max_length + 1))]
+    )
+
+    return Case(
+        rotor_names,
+        tuple(rng.integers(0, 26, size=3).tolist()),
+        str(rng.choice([r for r in REGISTRY.reflectors if r != "I"])),
+        plugboard_connections,
+        tuple(positions.tolist()),
+        message,
+    )
+
+
+def rotor_positions(enigma: Enigma) -> list[int]:
+    return [
+        enigma.left_rotor.position,
+        enigma.middle_rotor.position,
+        enigma.right_rotor.position,
+    ]
+
+
+def first_mismatch(engine: Callable[[Enigma], Any], case: Case) -> int | None:
+    enigma = case.enigma()
+    fast = engine(enigma)
+    expected = enigma.encrypt(case.message)
+    got = fast.encrypt(case.message)
+
+    for i, (a, b) in enumerate(zip(expected, got)):
+        if a != b:
+            return i
+    if len(expected) != len(got) or rotor_positions(enigma) != fast.positions:
+        return min(len(expected), len(got))
+    return None
+
+
+def shrink(engine: Callable[[Enigma], Any], case: Case) -> Case:
+    mismatch = first_mismatch(engine, case)
+    if mismatch is None:
+        return case
+    case = case._replace(message=case.message[: mismatch + 1])
+
+    def candidates(case: Case) -> list[Case]:
+        pairs = case.plugboard_connections.split()
+        ring_settings = list(case.ring_settings)
+        return [
+            case._replace(message=case.message.replace(" ", "")),
+            case._replace(message=case.message.upper()),
+            *(
+                case._replace(
+                    plugboard_connections=" ".join(pairs[:i] + pairs[i + 1 :])
+                )
+                for i in range(len(pairs))
+            ),
+            *(
+                case._replace(
+                    ring_settings=tuple(
+                        ring_settings[:i] + [0] + ring_settings[i + 1 :]
+                    )
+                )
+                for i in range(3)
+                if ring_settings[i] != 0
+            ),
+        ]
+
+    shrunk = True
+    while shrunk:
+        shrunk = False
+        for candidate in candidates(case):
+            if candidate == case:
+                continue
+
+            mismatch = first_mismatch(engine, candidate)
+            if mismatch is not None:
+                case = candidate._replace(message=candidate.message[: mismatch + 1])
+                shrunk = True
+                break
+
+    return case
+
+
+class Report(NamedTuple):
+    engine: str
+    cases: int
+    characters: int
+    reference_seconds: float
+    engine_seconds: float
+    failures: list[Case]
+
+    @property
+    def reference_rate(self) -> float:
+        return self.characters / self.reference_seconds if self.reference_seconds else 0
+
+    @property
+    def engine_rate(self) -> float:
+        return self.characters / self.engine_seconds if self.engine_seconds else 0
+
+    def __str__(self) -> str:
+        lines = [
+            f"{self.engine}: {self.cases} cases, {self.characters} characters, "
+            f"{len(self.failures)} failures",
+            f"  reference {self.reference_rate:,.0f} chars/s, "
+            f"{self.engine} {self.engine_rate:,.0f} chars/s",
+        ]
+        lines.extend(f"  FAIL {case}" for case in self.failures)
+        return "\n".join(lines)
+
+
+def run(
+    engines: Sequence[str] | None = None,
+    cases: int = 1000,
+    seed: int = 0,
+    max_length: int = 200,
+    max_failures: int = 10,
+) -> list[Report]:
+    reports = []
+
+    for name in engines or list(ENGINES):
+        engine = ENGINES[name]
+        rng = np.random.default_rng(seed)
+        characters = 0
+        reference_seconds = engine_seconds = 0.0
+        failures: list[Case] = []
+
+        for _ in range(cases):
+            case = random_case(rng, max_length)
+            enigma = case.enigma()
+            fast = engine(enigma)
+
+            t0 = time.perf_counter()
+            expected = enigma.encrypt(case.message)
+            t1 = time.perf_counter()
+            got = fast.encrypt(case.message)
+            t2 = time.perf_counter()
+
+            characters += len(case.message)
+            reference_seconds += t1 - t0
+            engine_seconds += t2 - t1
+
+            if got != expected or rotor_positions(enigma) != fast.positions:
+                failures.append(shrink(engine, case))
+                if len(failures) >= max_failures:
+                    break
+
+        reports.append(
+            Report(name, cases, characters, reference_seconds, engine_seconds, failures)
+        )
+
+    return reports
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    argv = argv if argv is not None else sys.argv[1:]
+    parser = argparse.ArgumentParser(
+        prog="python -m enigma_simulator.difftest",
+        description=(
+            "Compare the fast Enigma engines against the matrix reference on random "
+            "keys and messages, shrinking any mismatch to a minimal reproducer."
+        ),
+    )
+    parser.add_argument(
+        "-e",
+        "--engine",
+        type=str,
+        nargs="*",
+        choices=list(ENGINES),
+        help="Engines to test. Defaults to all of them.",
+    )
+    parser.add_argument("-n", "--cases", type=int, default=1000)
+    parser.add_argument("-s", "--seed", type=int, default=0)
+    parser.add_argument("-l", "--max-length", type=int, default=200)
+    parser.add_argument("--max-failures", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    reports = run(
+        args.engine, args.cases, args.seed, args.max_length, args.max_failures
+    )
+    for report in reports:
+        output.write_line(str(report))
+
+    return 1 if any(report.failures for report in reports) else 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,438 @@
+from __future__ import annotations
+
+import atexit
+import copy
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Any
+from typing import Sequence
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from enigma_simulator import metrics
+from enigma_simulator import shared
+from enigma_simulator.components import Plugboard
+from enigma_simulator.registry import REGISTRY
+from enigma_simulator.stepping import step_schedule
+from enigma_simulator.stepping import StepSchedule
+from enigma_simulator.utils import char_to_int
+
+if TYPE_CHECKING:  # pragma: no cover
+    from enigma_simulator.enigma import Enigma
+    from enigma_simulator.key import EnigmaKey
+    from enigma_simulator.trace import Trace
+
+
+def transform_to_permutation(transform: np.ndarray) -> np.ndarray:
+    return np.argmax(transform, axis=0).astype(np.uint8)
+
+
+def letter_mask(data: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    ints = (data | 0x20) - np.uint8(ord("a"))
+    return ints, ints < 26
+
+
+def _freeze(*arrays: np.ndarray | None) -> None:
+    for array in arrays:
+        if array is not None:
+            array.flags.writeable = False
+
+
+class ScramblerCore:
+    # Rotor and reflector tables of a machine, everything but the plugboard. Cores are
+    # shared between machines, so every table is read-only; derived tables are built
+    # on first use.
+
+    def __init__(
+        self, forward: np.ndarray, reflector: np.ndarray, notches: np.ndarray
+    ) -> None:
+        # forward[rotor, position, letter] with rotors ordered left, middle, right.
+        self.forward = forward
+        self.backward = np.argsort(forward, axis=2).astype(np.uint8)
+        self.reflector = reflector
+        self.notches = notches
+        _freeze(self.forward, self.backward, self.reflector, self.notches)
+        self._composite: np.ndarray | None = None
+        self._successors: np.ndarray | None = None
+        self._lists: tuple[Any, ...] | None = None
+        # Set once the tables are published to shared memory.
+        self.handle: shared.Handle | None = None
+
+    @classmethod
+    def from_tables(
+        cls,
+        forward: np.ndarray,
+        backward: np.ndarray,
+        reflector: np.ndarray,
+        notches: np.ndarray,
+        composite: np.ndarray | None = None,
+        successors: np.ndarray | None = None,
+    ) -> ScramblerCore:
+        # Wraps existing tables, e.g. views onto shared memory, without copying them.
+        core = cls.__new__(cls)
+        core.forward, core.backward = forward, backward
+        core.reflector, core.notches = reflector, notches
+        core._composite, core._successors = composite, successors
+        _freeze(forward, backward, reflector, notches, composite, successors)
+        core._lists = None
+        core.handle = None
+        return core
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        # Published cores travel to workers as a handle onto the shared segment.
+        if self.handle is not None:
+            return shared.attach_core, (self.handle,)
+        return ScramblerCore.from_tables, (
+            self.forward,
+            self.backward,
+            self.reflector,
+            self.notches,
+        )
+
+    def scramble(
+        self, lefts: np.ndarray, middles: np.ndarray, rights: np.ndarray
+    ) -> np.ndarray:
+        # Plugboard-free permutation for each of the given rotor positions.
+        lefts, middles, rights = lefts[:, None], middles[:, None], rights[:, None]
+        forward, backward = self.forward, self.backward
+
+        x = np.broadcast_to(np.arange(26, dtype=np.uint8), (len(lefts), 26))
+        x = forward[2, rights, x]
+        x = forward[1, middles, x]
+        x = forward[0, lefts, x]
+        x = self.reflector[x]
+        x = backward[0, lefts, x]
+        x = backward[1, middles, x]
+        return backward[2, rights, x]
+
+    def composite_tables(self) -> np.ndarray:
+        # Permutation at every rotor position, indexed by left * 676 + middle * 26 +
+        # right.
+        if self._composite is None:
+            lefts, middles, rights = np.unravel_index(np.arange(26 ** 3), (26, 26, 26))
+            self._composite = self.scramble(lefts, middles, rights)
+            _freeze(self._composite)
+        return self._composite
+
+    def schedule(self) -> StepSchedule:
+        _, middle_notches, right_notches = self.notches
+        return step_schedule(
+            np.flatnonzero(middle_notches).tolist(),
+            np.flatnonzero(right_notches).tolist(),
+        )
+
+    def successors(self) -> np.ndarray:
+        # Position index after one keypress from every position index.
+        if self._successors is None:
+            self._successors = self.schedule().successors
+        return self._successors
+
+    def lists(self) -> tuple[Any, ...]:
+        if self._lists is None:
+            self._lists = (
+                self.forward.tolist(),
+                self.backward.tolist(),
+                self.reflector.tolist(),
+                [np.flatnonzero(n).tolist() for n in self.notches],
+            )
+        return self._lists
+
+
+@lru_cache(maxsize=256)
+def _scrambler_core(
+    rotor_names: tuple[str, ...],
+    ring_settings: tuple[int, ...],
+    reflector_type: str,
+    version: int,
+) -> ScramblerCore:
+    # version is the registry's, so re-registered wirings aren't served from the cache.
+    wirings = [REGISTRY.rotor(name) for name in rotor_names]
+    forward = np.array(
+        [
+            wiring.tables(ring_setting)[0]
+            for wiring, ring_setting in zip(wirings, ring_settings)
+        ]
+    )
+    notches = np.zeros((3, 26), dtype=bool)
+    for i, wiring in enumerate(wirings):
+        notches[i, list(wiring.turnover_positions)] = True
+
+    return ScramblerCore(forward, REGISTRY.reflector(reflector_type).table, notches)
+
+
+def scrambler_core(
+    rotor_names: Sequence[str], ring_settings: Sequence[int], reflector_type: str
+) -> ScramblerCore:
+    misses = _scrambler_core.cache_info().misses
+    core = _scrambler_core(
+        tuple(rotor_names),
+        tuple(int(i) % 26 for i in ring_settings),
+        reflector_type,
+        REGISTRY.version,
+    )
+    hit = _scrambler_core.cache_info().misses == misses
+    metrics.increment(
+        "cache.scrambler_core.hit" if hit else "cache.scrambler_core.miss"
+    )
+    return core
+
+
+@lru_cache(maxsize=1024)
+def plugboard_permutation(connections: str) -> np.ndarray:
+    permutation = transform_to_permutation(
+        Plugboard.connections_to_transform(connections)
+    )
+    permutation.flags.writeable = False
+    return permutation
+
+
+class CompiledEnigma:
+    name = "vectorized"
+    # Set to a Trace to record every keypress; checked once per call, not per letter.
+    trace: Trace | None = None
+
+    def __init__(
+        self,
+        core: ScramblerCore,
+        plugboard: np.ndarray,
+        rotor_positions: Sequence[int] | str = (0, 0, 0),
+    ) -> None:
+        self.core = core
+        self.plugboard = plugboard
+        self.update_rotor_positions(rotor_positions)
+        metrics.increment(f"machines.constructed.{self.name}")
+
+    # The tables are read through the core, so a pickled machine carries only the core,
+    # which is a small handle once published to shared memory.
+    @property
+    def forward(self) -> np.ndarray:
+        return self.core.forward
+
+    @property
+    def backward(self) -> np.ndarray:
+        return self.core.backward
+
+    @property
+    def reflector(self) -> np.ndarray:
+        return self.core.reflector
+
+    @property
+    def notches(self) -> np.ndarray:
+        return self.core.notches
+
+    @classmethod
+    def from_enigma(cls, enigma: Enigma) -> CompiledEnigma:
+        with metrics.timer(f"construct.{cls.name}"):
+            rotors = (enigma.left_rotor, enigma.middle_rotor, enigma.right_rotor)
+            return cls(
+                scrambler_core(
+                    [rotor.name for rotor in rotors],
+                    [rotor.ring_setting for rotor in rotors],
+                    enigma.reflector_type,
+                ),
+                transform_to_permutation(enigma.plugboard.transform),
+                [rotor.position for rotor in rotors],
+            )
+
+    @classmethod
+    def from_settings(
+        cls,
+        rotor_names: Sequence[str],
+        ring_settings: Sequence[int],
+        reflector_type: str,
+        plugboard_connections: str = "",
+        rotor_positions: Sequence[int] | str = (0, 0, 0),
+    ) -> CompiledEnigma:
+        with metrics.timer(f"construct.{cls.name}"):
+            # Only the plugboard is specific to this machine; the rotor tables are
+            # shared with every machine with the same wheel order, rings and reflector.
+            return cls(
+                scrambler_core(rotor_names, ring_settings, reflector_type),
+                plugboard_permutation(plugboard_connections),
+                rotor_positions,
+            )
+
+    @classmethod
+    def from_key(
+        cls, key: EnigmaKey, rotor_positions: Sequence[int] | str = (0, 0, 0)
+    ) -> CompiledEnigma:
+        return cls.from_settings(
+            key.rotor_names,
+            key.ring_settings,
+            key.reflector_type,
+            key.plugboard_connections,
+            rotor_positions,
+        )
+
+    def update_rotor_positions(self, rotor_positions: Sequence[int] | str) -> None:
+        if isinstance(rotor_positions, str):
+            self.positions = [char_to_int(c) for c in rotor_positions]
+        else:
+            self.positions = [int(i) % 26 for i in rotor_positions]
+
+    def set_plugboard(self, plugboard_connections: str) -> None:
+        self.plugboard = plugboard_permutation(plugboard_connections)
+
+    def with_plugboard(self, plugboard_connections: str) -> CompiledEnigma:
+        machine = copy.copy(self)
+        machine.positions = list(self.positions)
+        machine.set_plugboard(plugboard_connections)
+        return machine
+
+    def step(self, n: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        # Positions at each of the next n keypresses, sliced from the stepping schedule
+        # shared by every machine with the same notches.
+        lefts, middles, rights = self.core.schedule().positions(self.positions, n)
+        if n > 0:
+            self.positions = [int(lefts[-1]), int(middles[-1]), int(rights[-1])]
+        return lefts, middles, rights
+
+    def encrypt_ints(self, ints: np.ndarray) -> np.ndarray:
+        if self.trace is not None:
+            return self._encrypt_traced(ints, self.trace)
+
+        lefts, middles, rights = self.step(len(ints))
+        forward, backward = self.forward, self.backward
+
+        x = self.plugboard[ints]
+        x = forward[2, rights, x]
+        x = forward[1, middles, x]
+        x = forward[0, lefts, x]
+        x = self.reflector[x]
+        x = backward[0, lefts, x]
+        x = backward[1, middles, x]
+        x = backward[2, rights, x]
+        return self.plugboard[x]
+
+    def _encrypt_traced(self, ints: np.ndarray, trace: Trace) -> np.ndarray:
+        lefts, middles, rights = self.step(len(ints))
+        forward, backward = self.forward, self.backward
+        positions, letters = trace.allocate(len(ints))
+        positions[:, 0], positions[:, 1], positions[:, 2] = lefts, middles, rights
+
+        letters[:, 0] = ints
+        letters[:, 1] = self.plugboard[letters[:, 0]]
+        letters[:, 2] = forward[2, rights, letters[:, 1]]
+        letters[:, 3] = forward[1, middles, letters[:, 2]]
+        letters[:, 4] = forward[0, lefts, letters[:, 3]]
+        letters[:, 5] = self.reflector[letters[:, 4]]
+        letters[:, 6] = backward[0, lefts, letters[:, 5]]
+        letters[:, 7] = backward[1, middles, letters[:, 6]]
+        letters[:, 8] = backward[2, rights, letters[:, 7]]
+        letters[:, 9] = self.plugboard[letters[:, 8]]
+        return letters[:, 9].copy()
+
+    def scramblers(self, n: int) -> np.ndarray:
+        # Plugboard-free permutation applied at each of the next n keypresses.
+        return self.core.scramble(*self.step(n))
+
+    def composite_tables(self) -> np.ndarray:
+        return self.core.composite_tables()
+
+    def successors(self) -> np.ndarray:
+        return self.core.successors()
+
+    def encrypt_bytes(
+        self, data: np.ndarray, out: np.ndarray | None = None
+    ) -> np.ndarray:
+        with metrics.timer(f"encrypt.{self.name}"):
+            ints, mask = letter_mask(data)
+            if out is None:
+                out = data.copy()
+            elif out is not data:
+                out[:] = data
+
+            out[mask] = self.encrypt_ints(ints[mask]) + np.uint8(ord("A"))
+
+        metrics.increment(f"characters.{self.name}", len(data))
+        return out
+
+    def encrypt(self, message: str) -> str:
+        data = np.frombuffer(message.encode(), dtype=np.uint8)
+        return self.encrypt_bytes(data).tobytes().decode()
+
+    def encrypt_scalar(self, message: str) -> str:
+        if self.trace is not None:
+            return CompiledEnigma.encrypt(self, message)
+
+        t0 = time.perf_counter()
+        forward, backward, reflector, notches = self.core.lists()
+        plugboard = self.plugboard.tolist()
+        left_forward, middle_forward, right_forward = forward
+        left_backward, middle_backward, right_backward = backward
+        _, middle_notches, right_notches = notches
+        left, middle, right = self.positions
+
+        encrypted = []
+        for char in message:
+            x = ord(char) - 65
+            if not 0 <= x < 26:
+                x -= 32
+                if not 0 <= x < 26:
+                    encrypted.append(char)
+                    continue
+
+            if middle in middle_notches:
+                middle = (middle + 1) % 26
+                left = (left + 1) % 26
+            elif right in right_notches:
+                middle = (middle + 1) % 26
+            right = (right + 1) % 26
+
+            x = plugboard[x]
+            x = right_forward[right][x]
+            x = middle_forward[middle][x]
+            x = left_forward[left][x]
+            x = reflector[x]
+            x = left_backward[left][x]
+            x = middle_backward[middle][x]
+            x = right_backward[right][x]
+            encrypted.append(chr(plugboard[x] + 65))
+
+        self.positions = [left, middle, right]
+        metrics.record_time(f"encrypt.{self.name}", time.perf_counter() - t0)
+        metrics.increment(f"characters.{self.name}", len(message))
+        return "".join(encrypted)
+
+
+class TableEnigma(CompiledEnigma):
+    name = "table"
+    encrypt = CompiledEnigma.encrypt_scalar
+
+
+def _encrypt_segment(machine: CompiledEnigma, ints: np.ndarray) -> np.ndarray:
+    return CompiledEnigma.encrypt_ints(machine, ints)
+
+
+class ProcessEnigma(CompiledEnigma):
+    name = "process"
+    segment_size = 1 << 20
+    workers = os.cpu_count() or 1
+    _executor: ProcessPoolExecutor | None = None
+
+    @classmethod
+    def executor(cls) -> ProcessPoolExecutor:
+        if ProcessEnigma._executor is None:
+            ProcessEnigma._executor = ProcessPoolExecutor(cls.workers)
+            atexit.register(ProcessEnigma._executor.shutdown)
+        return ProcessEnigma._executor
+
+    def encrypt_ints(self, ints: np.ndarray) -> np.ndarray:
+        segment_size = max(self.segment_size, -(-len(ints) // self.workers))
+        if len(ints) <= segment_size or self.trace is not None:
+            return super().encrypt_ints(ints)
+
+        # Workers attach to the published tables rather than unpickling copies.
+        shared.publish_core(self.core)
+        futures = []
+        for start in range(0, len(ints), segment_size):
+            segment = ints[start : start + segment_size]
+            machine = copy.copy(self)
+            machine.positions = list(self.positions)
+            futures.append(self.executor().submit(_encrypt_segment, machine, segment))
+            self.step(len(segment))
+
+        return np.concatenate([f.result() for f in futures])
@@ -1,11 +1,21 @@
 from __future__ import annotations
 
+import time
+from typing import Any
+from typing import Sequence
+
 import numpy as np
 
+from enigma_simulator import metrics
+from enigma_simulator.backends import BACKENDS
+from enigma_simulator.backends import compile_enigma
+from enigma_simulator.backends import select_backend
 from enigma_simulator.components import get_reflector
 from enigma_simulator.components import get_rotor
 from enigma_simulator.components import Plugboard
+from enigma_simulator.engine import CompiledEnigma
 from enigma_simulator.key import EnigmaKey
+from enigma_simulator.trace import Trace
 from enigma_simulator.utils import char_to_int
 from enigma_simulator.utils import char_to_vec
 from enigma_simulator.utils import int_to_char
@@ -19,38 +29,95 @@ class Enigma:
         ring_settings: list[int],
         reflector_type: str,
         plugboard_connections: str,
-        rotor_positions: list[int] | list[str],
+        rotor_positions: Sequence[int | str],
+        backend: str = "auto",
     ) -> None:
-        print(rotor_names, ring_settings, rotor_positions)
-        self.left_rotor, self.middle_rotor, self.right_rotor = tuple(
-            get_rotor(*i) for i in zip(rotor_names, ring_settings, rotor_positions)
-        )
-        self.reflector = get_reflector(reflector_type)
-        self.plugboard = Plugboard(plugboard_connections)
+        if backend not in BACKENDS:
+            raise ValueError(
+                f"Unknown backend {backend!r}. Should be one of: {', '.join(BACKENDS)}."
+            )
+
+        with metrics.timer("construct.matrix"):
+            self.left_rotor, self.middle_rotor, self.right_rotor = tuple(
+                get_rotor(*i) for i in zip(rotor_names, ring_settings, rotor_positions)
+            )
+            self.reflector = get_reflector(reflector_type)
+            self.reflector_type = reflector_type
+            self.plugboard = Plugboard(plugboard_connections)
+        metrics.increment("machines.constructed.matrix")
+        self.backend = backend
+        self.trace: Trace | None = None
+        self._compiled: dict[str, CompiledEnigma] = {}
 
     def encrypt(self, message: str) -> str:
+        backend = self.backend
+        if backend == "auto":
+            backend = select_backend(len(message))
+
+        if backend == "matrix":
+            return self.encrypt_matrix(message)
+
+        if backend not in self._compiled:
+            metrics.increment("cache.compiled.miss")
+            self._compiled[backend] = compile_enigma(self, backend)
+        else:
+            metrics.increment("cache.compiled.hit")
+        compiled = self._compiled[backend]
+
+        compiled.update_rotor_positions(
+            [
+                self.left_rotor.position,
+                self.middle_rotor.position,
+                self.right_rotor.position,
+            ]
+        )
+        compiled.trace = self.trace
+        encrypted = compiled.encrypt(message)
+        self.update_rotor_positions(compiled.positions)
+
+        return encrypted
+
+    def encrypt_matrix(self, message: str) -> str:
+        stages = (
+            self.plugboard.forward,
+            self.right_rotor.forward,
+            self.middle_rotor.forward,
+            self.left_rotor.forward,
+            self.reflector.forward,
+            self.left_rotor.backward,
+            self.middle_rotor.backward,
+            self.right_rotor.backward,
+            self.plugboard.forward,
+        )
+        trace = self.trace
+        t0 = time.perf_counter()
+
         encrypted = ""
         for char in list(message):
-            if char == " ":
-                encrypted += " "
+            if not char.isascii() or not char.isalpha():
+                encrypted += char
                 continue
 
             self.rotate()
 
-            vec = char_to_vec(char)
-            vec = self.plugboard.forward(vec)
-            vec = self.right_rotor.forward(vec)
-            vec = self.middle_rotor.forward(vec)
-            vec = self.left_rotor.forward(vec)
-            vec = self.reflector.forward(vec)
-            vec = self.left_rotor.backward(vec)
-            vec = self.middle_rotor.backward(vec)
-            vec = self.right_rotor.backward(vec)
-            vec = self.plugboard.forward(vec)
-            char = vec_to_char(vec)
+            vecs = [char_to_vec(char)]
+            for stage in stages:
+                vecs.append(stage(vecs[-1]))
+            char = vec_to_char(vecs[-1])
+
+            if trace is not None:
+                positions, letters = trace.allocate(1)
+                positions[0] = [
+                    self.left_rotor.position,
+                    self.middle_rotor.position,
+                    self.right_rotor.position,
+                ]
+                letters[0] = [np.argmax(vec) for vec in vecs]
 
             encrypted += char
 
+        metrics.record_time("encrypt.matrix", time.perf_counter() - t0)
+        metrics.increment("characters.matrix", len(message))
         return encrypted
 
     def encrypt_transmission(
@@ -59,35 +126,12 @@ class Enigma:
         start_position: str | None = None,
         message_key: str | None = None,
     ) -> tuple[str, str, str]:
-        if start_position is None:
-            rand_ints = np.random.randint(0, 26, size=3)
-            _start_position = "".join(int_to_char(i) for i in rand_ints)
-            self.update_rotor_positions(rand_ints)
-        else:
-            _start_position = start_position
-            self.update_rotor_positions(start_position)
-
-        if message_key is None:
-            _message_key = "".join(
-                int_to_char(i) for i in np.random.randint(0, 26, size=3)
-            )
-            encrypted_key = self.encrypt(_message_key)
-        else:
-            _message_key = message_key
-            encrypted_key = self.encrypt(message_key)
-
-        self.update_rotor_positions(_message_key)
-
-        return (_start_position, encrypted_key, self.encrypt(message))
+        return encrypt_transmission(self, message, start_position, message_key)
 
     def decrypt_transmission(
         self, start_position: str, encrypted_key: str, message: str
     ) -> str:
-        self.update_rotor_positions(start_position)
-        key = self.encrypt(encrypted_key)
-        self.update_rotor_positions(key)
-
-        return self.encrypt(message)
+        return decrypt_transmission(self, start_position, encrypted_key, message)
 
     def rotate(self) -> None:
         if self.middle_rotor.at_notch:
@@ -111,8 +155,46 @@ class Enigma:
         ) = tuple(_rotor_positions)
 
 
+def encrypt_transmission(
+    machine: Any,
+    message: str,
+    start_position: str | None = None,
+    message_key: str | None = None,
+) -> tuple[str, str, str]:
+    if start_position is None:
+        rand_ints = np.random.randint(0, 26, size=3)
+        _start_position = "".join(int_to_char(i) for i in rand_ints)
+        machine.update_rotor_positions(rand_ints)
+    else:
+        _start_position = start_position
+        machine.update_rotor_positions(start_position)
+
+    if message_key is None:
+        _message_key = "".join(int_to_char(i) for i in np.random.randint(0, 26, size=3))
+        encrypted_key = machine.encrypt(_message_key)
+    else:
+        _message_key = message_key
+        encrypted_key = machine.encrypt(message_key)
+
+    machine.update_rotor_positions(_message_key)
+
+    return (_start_position, encrypted_key, machine.encrypt(message))
+
+
+def decrypt_transmission(
+    machine: Any, start_position: str, encrypted_key: str, message: str
+) -> str:
+    machine.update_rotor_positions(start_position)
+    key = machine.encrypt(encrypted_key)
+    machine.update_rotor_positions(key)
+
+    return machine.encrypt(message)
+
+
 def create_enigma_from_key(
-    key: EnigmaKey, rotor_positions: list[int] = [0, 0, 0]
+    key: EnigmaKey,
+    rotor_positions: Sequence[int | str] = (0, 0, 0),
+    backend: str = "auto",
 ) -> Enigma:
     return Enigma(
         [i for i in key.rotor_names],
@@ -120,4 +202,5 @@ def create_enigma_from_key(
         key.reflector_type,
         key.plugboard_connections,
         rotor_positions,
+        backend,
     )
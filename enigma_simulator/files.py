@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import mmap
+import os
+
+import numpy as np
+
+from enigma_simulator.engine import CompiledEnigma
+
+WINDOW_SIZE = 1 << 20
+
+
+def _encrypt_windows(
+    engine: CompiledEnigma, source: mmap.mmap, target: mmap.mmap, window_size: int
+) -> None:
+    source_array = np.frombuffer(source, dtype=np.uint8)
+    target_array = np.frombuffer(target, dtype=np.uint8)
+
+    for start in range(0, len(source_array), window_size):
+        stop = start + window_size
+        engine.encrypt_bytes(source_array[start:stop], out=target_array[start:stop])
+
+
+def encrypt_file(
+    engine: CompiledEnigma,
+    input_path: str,
+    output_path: str,
+    window_size: int = WINDOW_SIZE,
+) -> int:
+    if window_size <= 0:
+        raise ValueError(f"Window size should be positive, not {window_size}.")
+    if os.path.exists(output_path) and os.path.samefile(input_path, output_path):
+        raise ValueError("Input and output should be different files.")
+
+    with open(input_path, "rb") as input_file, open(output_path, "w+b") as output_file:
+        size = os.fstat(input_file.fileno()).st_size
+        output_file.truncate(size)
+        if size == 0:
+            return 0
+
+        with mmap.mmap(
+            input_file.fileno(), 0, access=mmap.ACCESS_READ
+        ) as source, mmap.mmap(output_file.fileno(), size) as target:
+            # The numpy views live in _encrypt_windows so they are released before
+            # the maps are closed.
+            _encrypt_windows(engine, source, target, window_size)
+            target.flush()
+
+    return size
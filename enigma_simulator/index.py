@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import itertools
+import os
+from functools import lru_cache
+from typing import Iterable
+from typing import NamedTuple
+from typing import Sequence
+
+import numpy as np
+
+from enigma_simulator.engine import CompiledEnigma
+from enigma_simulator.keyspace import POSITIONS
+from enigma_simulator.positions import position_string
+
+# Keypress offsets whose scrambler products make up a signature. The default is the
+# doubled message key: the first and fourth, second and fifth, third and sixth letters.
+DEFAULT_PAIRS = ((0, 3), (1, 4), (2, 5))
+# Each product's cycle type is stored as a 12-bit partition id, so a signature packs
+# up to five products into a uint64.
+PARTITION_BITS = 12
+MAX_PAIRS = 64 // PARTITION_BITS
+
+
+def _partitions(n: int, largest: int) -> Iterable[tuple[int, ...]]:
+    if n == 0:
+        yield ()
+        return
+    for part in range(min(n, largest), 0, -1):
+        for rest in _partitions(n - part, part):
+            yield (part,) + rest
+
+
+@lru_cache(maxsize=None)
+def partition_ids() -> dict[tuple[int, ...], int]:
+    # The 2,436 partitions of 26, i.e. every possible cycle type of a permutation.
+    return {p: i for i, p in enumerate(_partitions(26, 26))}
+
+
+def cycle_lengths(permutations: np.ndarray) -> np.ndarray:
+    # Length of the cycle each letter is on, for a (N, 26) stack of permutations.
+    start = np.broadcast_to(np.arange(26, dtype=permutations.dtype), permutations.shape)
+    lengths = np.zeros(permutations.shape, dtype=np.uint8)
+    x = permutations
+    for length in range(1, 27):
+        lengths[(lengths == 0) & (x == start)] = length
+        x = np.take_along_axis(permutations, x.astype(np.intp), axis=1)
+    return lengths
+
+
+def _cycle_type(lengths: Sequence[int]) -> tuple[int, ...]:
+    # A cycle of length n shows up as n letters of length n; keep one part per cycle.
+    parts = []
+    i = 0
+    while i < len(lengths):
+        parts.append(int(lengths[i]))
+        i += int(lengths[i])
+    return tuple(parts)
+
+
+def cycle_type_ids(permutations: np.ndarray) -> np.ndarray:
+    lengths = np.sort(cycle_lengths(permutations), axis=1)[:, ::-1]
+    unique, inverse = np.unique(lengths, axis=0, return_inverse=True)
+
+    ids = partition_ids()
+    unique_ids = np.array([ids[_cycle_type(row)] for row in unique], dtype=np.uint64)
+    return unique_ids[inverse.reshape(-1)]
+
+
+def signatures(
+    scramblers: np.ndarray, pairs: Sequence[tuple[int, int]] = DEFAULT_PAIRS
+) -> np.ndarray:
+    # scramblers[n, k] is the permutation at keypress k of the n-th candidate. Only
+    # the conjugacy class of each product is kept, which the plugboard can't change.
+    if not 0 < len(pairs) <= MAX_PAIRS:
+        raise ValueError(f"Signatures need between 1 and {MAX_PAIRS} pairs.")
+
+    result = np.zeros(len(scramblers), dtype=np.uint64)
+    for a, b in pairs:
+        products = np.take_along_axis(
+            scramblers[:, b], scramblers[:, a].astype(np.intp), axis=1
+        )
+        result = (result << np.uint64(PARTITION_BITS)) | cycle_type_ids(products)
+    return result
+
+
+def signature(
+    permutations: Sequence[Sequence[int]],
+    pairs: Sequence[tuple[int, int]] = DEFAULT_PAIRS,
+) -> int:
+    # Signature of the full enciphering permutations (plugboard included) at each
+    # keypress, e.g. as reconstructed from a day's indicators.
+    return int(signatures(np.array([permutations], dtype=np.uint8), pairs)[0])
+
+
+class InvariantIndex(NamedTuple):
+    # Plugboard-invariant signatures of every rotor core position of a wheel order.
+    # Positions are wiring offsets (position minus ring setting), and only the right
+    # rotor is assumed to move over the keypresses in pairs. Matches still need their
+    # ring settings and plugboard recovered.
+    rotor_names: tuple[str, ...]
+    reflector_type: str
+    pairs: tuple[tuple[int, int], ...]
+    signatures: np.ndarray
+    positions: np.ndarray
+
+    @classmethod
+    def build(
+        cls,
+        rotor_names: Sequence[str],
+        reflector_type: str = "B",
+        pairs: Sequence[tuple[int, int]] = DEFAULT_PAIRS,
+    ) -> InvariantIndex:
+        tables = CompiledEnigma.from_settings(
+            rotor_names, [0, 0, 0], reflector_type
+        ).composite_tables()
+
+        keypresses = max(itertools.chain.from_iterable(pairs)) + 1
+        lefts_middles, rights = np.divmod(np.arange(POSITIONS), 26)
+        scramblers = np.stack(
+            [
+                tables[lefts_middles * 26 + (rights + k + 1) % 26]
+                for k in range(keypresses)
+            ],
+            axis=1,
+        )
+
+        keys = signatures(scramblers, pairs)
+        order = np.argsort(keys, kind="stable")
+        return cls(
+            tuple(rotor_names),
+            reflector_type,
+            tuple((int(a), int(b)) for a, b in pairs),
+            keys[order],
+            order.astype(np.uint16),
+        )
+
+    def __len__(self) -> int:
+        return len(self.signatures)
+
+    def lookup(self, signature: int) -> list[str]:
+        key = np.uint64(signature)
+        start = np.searchsorted(self.signatures, key, side="left")
+        stop = np.searchsorted(self.signatures, key, side="right")
+        return [position_string(int(i)) for i in self.positions[start:stop]]
+
+    def lookup_permutations(self, permutations: Sequence[Sequence[int]]) -> list[str]:
+        return self.lookup(signature(permutations, self.pairs))
+
+    def save(self, file_path: str) -> None:
+        np.savez_compressed(
+            file_path,
+            rotor_names=np.array(self.rotor_names),
+            reflector_type=np.array(self.reflector_type),
+            pairs=np.array(self.pairs),
+            signatures=self.signatures,
+            positions=self.positions,
+        )
+
+    @classmethod
+    def load(cls, file_path: str) -> InvariantIndex:
+        with np.load(file_path) as data:
+            return cls(
+                tuple(str(i) for i in data["rotor_names"]),
+                str(data["reflector_type"]),
+                tuple((int(a), int(b)) for a, b in data["pairs"]),
+                data["signatures"],
+                data["positions"],
+            )
+
+
+def index_path(directory: str, rotor_names: Sequence[str], reflector_type: str) -> str:
+    return os.path.join(directory, f"{'-'.join(rotor_names)}-{reflector_type}.npz")
+
+
+def build_indexes(
+    directory: str,
+    wheel_orders: Iterable[Sequence[str]],
+    reflector_type: str = "B",
+    pairs: Sequence[tuple[int, int]] = DEFAULT_PAIRS,
+) -> list[str]:
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for rotor_names in wheel_orders:
+        path = index_path(directory, rotor_names, reflector_type)
+        InvariantIndex.build(rotor_names, reflector_type, pairs).save(path)
+        paths.append(path)
+    return paths
+
+
+def lookup(
+    directory: str,
+    wheel_orders: Iterable[Sequence[str]],
+    permutations: Sequence[Sequence[int]],
+    reflector_type: str = "B",
+) -> list[tuple[tuple[str, ...], str]]:
+    # Candidate (wheel order, wiring offsets) across the saved indexes.
+    candidates: list[tuple[tuple[str, ...], str]] = []
+    for rotor_names in wheel_orders:
+        index = InvariantIndex.load(index_path(directory, rotor_names, reflector_type))
+        candidates.extend(
+            (index.rotor_names, p) for p in index.lookup_permutations(permutations)
+        )
+    return candidates
@@ -6,32 +6,58 @@ from typing import List
 
 import yaml
 from pydantic import BaseModel
+from pydantic import validator
 
+from enigma_simulator.registry import REGISTRY
 
-class RotorNameEnum(str, Enum):
-    one = "I"
-    two = "II"
-    three = "III"
-    four = "IV"
-    five = "V"
-    six = "VI"
-    seven = "VII"
-    eight = "VIII"
 
+_ROTOR_MEMBER_NAMES = {
+    "I": "one",
+    "II": "two",
+    "III": "three",
+    "IV": "four",
+    "V": "five",
+    "VI": "six",
+    "VII": "seven",
+    "VIII": "eight",
+}
 
-class ReflectorTypeEnum(str, Enum):
-    a = "A"
-    b = "B"
-    c = "C"
-    i = "I"
+# Built from the registry at import time, so they list the wirings loaded through
+# ENIGMA_SIMULATOR_WIRINGS too.
+RotorNameEnum = Enum(  # type: ignore
+    "RotorNameEnum",
+    [(_ROTOR_MEMBER_NAMES.get(name, name), name) for name in REGISTRY.rotors],
+    type=str,
+    module=__name__,
+)
+ReflectorTypeEnum = Enum(  # type: ignore
+    "ReflectorTypeEnum",
+    [(name.lower(), name) for name in REGISTRY.reflectors],
+    type=str,
+    module=__name__,
+)
 
 
 class EnigmaKey(BaseModel):
-    rotor_names: List[RotorNameEnum]
+    rotor_names: List[str]
     ring_settings: List[int]
-    reflector_type: ReflectorTypeEnum
+    reflector_type: str
     plugboard_connections: str = ""
 
+    # Names are checked against the registry rather than the enums above, so wirings
+    # registered after import are valid in keys too.
+    @validator("rotor_names", each_item=True)
+    def _registered_rotor(cls, name: str) -> str:
+        if name not in REGISTRY.rotors:
+            raise ValueError(f"Unknown rotor {name!r}.")
+        return name
+
+    @validator("reflector_type")
+    def _registered_reflector(cls, name: str) -> str:
+        if name not in REGISTRY.reflectors:
+            raise ValueError(f"Unknown reflector {name!r}.")
+        return name
+
 
 def load_key(file_path: str) -> EnigmaKey:
     with open(file_path, "r") as f:
@@ -0,0 +1,260 @@
+from __future__ import annotations
+
+import copy
+import csv
+import datetime
+import itertools
+import json
+from typing import Any
+from typing import Sequence
+
+import numpy as np
+import yaml
+
+from enigma_simulator import metrics
+from enigma_simulator.backends import ENGINES
+from enigma_simulator.engine import CompiledEnigma
+from enigma_simulator.key import EnigmaKey
+from enigma_simulator.registry import REGISTRY
+from enigma_simulator.utils import int_to_char
+
+DEFAULT_ROTORS = ("I", "II", "III", "IV", "V")
+CSV_FIELDS = (
+    "date",
+    "rotor_names",
+    "ring_settings",
+    "reflector_type",
+    "plugboard_connections",
+)
+
+
+def _connections(plugboard: np.ndarray) -> str:
+    return " ".join(
+        int_to_char(a) + int_to_char(int(b)) for a, b in enumerate(plugboard) if a < b
+    )
+
+
+class KeySheet:
+    # Daily keys stored column-wise, one row per date.
+
+    def __init__(
+        self,
+        dates: np.ndarray,
+        rotor_names: np.ndarray,
+        ring_settings: np.ndarray,
+        reflector_types: np.ndarray,
+        plugboard_connections: np.ndarray,
+    ) -> None:
+        self.dates = dates.astype("datetime64[D]")
+        self.rotor_names = rotor_names
+        self.ring_settings = ring_settings
+        self.reflector_types = reflector_types
+        self.plugboard_connections = plugboard_connections
+        self._rows = {str(d): i for i, d in enumerate(self.dates)}
+        self._machines: dict[tuple[int, str], CompiledEnigma] = {}
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def _row(self, date: str | datetime.date) -> int:
+        try:
+            return self._rows[str(np.datetime64(date, "D"))]
+        except KeyError:
+            raise KeyError(f"No key for {date}.")
+
+    def key(self, date: str | datetime.date) -> EnigmaKey:
+        i = self._row(date)
+        return EnigmaKey(
+            rotor_names=self.rotor_names[i].tolist(),
+            ring_settings=self.ring_settings[i].tolist(),
+            reflector_type=str(self.reflector_types[i]),
+            plugboard_connections=str(self.plugboard_connections[i]),
+        )
+
+    def machine(
+        self, date: str | datetime.date, backend: str = "vectorized"
+    ) -> CompiledEnigma:
+        # Machines are only compiled for the dates that are used, then copied so
+        # callers can set positions without affecting each other.
+        i = self._row(date)
+        if (i, backend) in self._machines:
+            metrics.increment("cache.compiled.hit")
+        else:
+            metrics.increment("cache.compiled.miss")
+            self._machines[i, backend] = ENGINES[backend].from_settings(
+                self.rotor_names[i].tolist(),
+                self.ring_settings[i].tolist(),
+                str(self.reflector_types[i]),
+                str(self.plugboard_connections[i]),
+            )
+        return copy.copy(self._machines[i, backend])
+
+    def records(self) -> list[dict[str, Any]]:
+        return [
+            {
+                "date": str(self.dates[i]),
+                "rotor_names": self.rotor_names[i].tolist(),
+                "ring_settings": self.ring_settings[i].tolist(),
+                "reflector_type": str(self.reflector_types[i]),
+                "plugboard_connections": str(self.plugboard_connections[i]),
+            }
+            for i in range(len(self))
+        ]
+
+    @classmethod
+    def from_records(cls, records: Sequence[dict[str, Any]]) -> KeySheet:
+        if not records:
+            raise RuntimeError("Key sheet has no keys.")
+
+        try:
+            columns = {
+                field: [record[field] for record in records]
+                for field in CSV_FIELDS
+                if field != "plugboard_connections"
+            }
+            connections = [r.get("plugboard_connections", "") for r in records]
+            sheet = cls(
+                np.array(columns["date"], dtype="datetime64[D]"),
+                np.array(columns["rotor_names"], dtype=str).reshape(len(records), 3),
+                np.array(columns["ring_settings"], dtype=np.int64).reshape(
+                    len(records), 3
+                ),
+                np.array(columns["reflector_type"], dtype=str),
+                np.array(connections, dtype=str),
+            )
+        except (KeyError, ValueError, TypeError) as e:
+            raise RuntimeError(f"Invalid key sheet: {e}")
+
+        sheet.validate()
+        return sheet
+
+    def validate(self) -> None:
+        # Checks every key at once and reports all the bad rows together.
+        errors: list[str] = []
+
+        dates, counts = np.unique(self.dates, return_counts=True)
+        errors.extend(f"{d}: duplicated date" for d in dates[counts > 1])
+
+        rotors = np.isin(self.rotor_names, list(REGISTRY.rotors)).all(axis=1)
+        errors.extend(f"{d}: unknown rotor" for d in self.dates[~rotors])
+
+        reflectors = np.isin(self.reflector_types, list(REGISTRY.reflectors))
+        errors.extend(f"{d}: unknown reflector" for d in self.dates[~reflectors])
+
+        pairs = [c.upper().split() for c in self.plugboard_connections.tolist()]
+        malformed = np.array(
+            [
+                any(len(p) != 2 or not (p.isascii() and p.isalpha()) for p in row)
+                for row in pairs
+            ],
+            dtype=bool,
+        )
+        errors.extend(f"{d}: invalid plugboard" for d in self.dates[malformed])
+
+        letters = ["".join(row) for row, bad in zip(pairs, malformed) if not bad]
+        rows = np.repeat(np.flatnonzero(~malformed), [len(i) for i in letters])
+        data = np.frombuffer("".join(letters).encode(), dtype=np.uint8) - ord("A")
+        plugs = np.bincount(rows * 26 + data, minlength=26 * len(self))
+        duplicates = (plugs.reshape(len(self), 26) > 1).any(axis=1)
+        errors.extend(f"{d}: duplicated plug" for d in self.dates[duplicates])
+
+        if errors:
+            raise RuntimeError("Invalid key sheet. " + "; ".join(errors))
+
+    @classmethod
+    def load(cls, file_path: str) -> KeySheet:
+        with open(file_path, "r", newline="") as f:
+            if file_path[-5:] == ".json":
+                data = json.load(f)
+            elif file_path[-5:] == ".yaml" or file_path[-4:] == ".yml":
+                data = yaml.safe_load(f)
+            elif file_path[-4:] == ".csv":
+                data = [
+                    {
+                        **row,
+                        "rotor_names": row["rotor_names"].split(),
+                        "ring_settings": [int(i) for i in row["ring_settings"].split()],
+                    }
+                    for row in csv.DictReader(f)
+                ]
+            else:
+                raise NotImplementedError
+
+        if isinstance(data, dict):
+            data = data["keys"]
+        return cls.from_records(data)
+
+    def save(self, file_path: str) -> None:
+        records = self.records()
+        with open(file_path, "w", newline="") as f:
+            if file_path[-5:] == ".json":
+                json.dump(records, f)
+            elif file_path[-5:] == ".yaml" or file_path[-4:] == ".yml":
+                yaml.safe_dump(records, f)
+            elif file_path[-4:] == ".csv":
+                writer = csv.DictWriter(f, CSV_FIELDS)
+                writer.writeheader()
+                for record in records:
+                    record["rotor_names"] = " ".join(record["rotor_names"])
+                    record["ring_settings"] = " ".join(
+                        str(i) for i in record["ring_settings"]
+                    )
+                    writer.writerow(record)
+            else:
+                raise NotImplementedError
+
+
+def generate_key_sheet(
+    start: str | datetime.date,
+    days: int,
+    rotor_names: Sequence[str] = DEFAULT_ROTORS,
+    reflector_type: str = "B",
+    plugs: int = 10,
+    seed: int | np.random.SeedSequence | None = None,
+) -> KeySheet:
+    if not 0 <= plugs <= 13:
+        raise ValueError("Number of plugs must be between 0 and 13.")
+    wheel_orders = np.array(list(itertools.permutations(rotor_names, 3)))
+    if len(wheel_orders) < 2 and days > 1:
+        raise ValueError("At least two wheel orders are needed to avoid repeats.")
+
+    rng = np.random.default_rng(seed)
+
+    # Each day moves a non-zero number of steps through the wheel orders, so no two
+    # consecutive days share one.
+    steps = rng.integers(1, max(len(wheel_orders), 2), size=days)
+    steps[0] = rng.integers(0, len(wheel_orders))
+    orders = np.cumsum(steps) % len(wheel_orders)
+
+    # The first 2 * plugs letters of a random shuffle per day give distinct pairs.
+    letters = np.argsort(rng.random((days, 26)), axis=1)[:, : 2 * plugs]
+    plugboards = np.tile(np.arange(26), (days, 1))
+    day_indices = np.arange(days)[:, None]
+    plugboards[day_indices, letters[:, 0::2]] = letters[:, 1::2]
+    plugboards[day_indices, letters[:, 1::2]] = letters[:, 0::2]
+
+    return KeySheet(
+        np.datetime64(start, "D") + np.arange(days),
+        wheel_orders[orders],
+        rng.integers(0, 26, size=(days, 3)),
+        np.full(days, reflector_type),
+        np.array([_connections(p) for p in plugboards], dtype=str),
+    )
+
+
+def generate_key_sheets(
+    networks: Sequence[str],
+    start: str | datetime.date,
+    days: int,
+    rotor_names: Sequence[str] = DEFAULT_ROTORS,
+    reflector_type: str = "B",
+    plugs: int = 10,
+    seed: int | None = None,
+) -> dict[str, KeySheet]:
+    seeds = np.random.SeedSequence(seed).spawn(len(networks))
+    return {
+        network: generate_key_sheet(
+            start, days, rotor_names, reflector_type, plugs, network_seed
+        )
+        for network, network_seed in zip(networks, seeds)
+    }
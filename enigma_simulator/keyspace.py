@@ -0,0 +1,269 @@
+from __future__ import annotations
+
+import itertools
+import json
+import os
+import time
+from typing import Any
+from typing import Callable
+from typing import Iterable
+from typing import NamedTuple
+from typing import Sequence
+
+from enigma_simulator.key import EnigmaKey
+from enigma_simulator.registry import REGISTRY
+from enigma_simulator.search import ProgressReport
+from enigma_simulator.search import SearchDriver
+from enigma_simulator.search import TopK
+from enigma_simulator.utils import char_to_int
+from enigma_simulator.utils import int_to_char
+
+POSITIONS = 26 ** 3
+
+
+class KeySettings(NamedTuple):
+    rotor_names: tuple[str, str, str]
+    reflector_type: str
+    ring_settings: tuple[int, int, int]
+    positions: tuple[int, int, int]
+
+    def to_key(self, plugboard_connections: str = "") -> EnigmaKey:
+        return EnigmaKey(
+            rotor_names=list(self.rotor_names),
+            ring_settings=list(self.ring_settings),
+            reflector_type=self.reflector_type,
+            plugboard_connections=plugboard_connections,
+        )
+
+    @property
+    def position_string(self) -> str:
+        return "".join(int_to_char(i) for i in self.positions)
+
+
+def _value(x: Any) -> str:
+    return str(getattr(x, "value", x))
+
+
+def _pack(values: Sequence[int]) -> int:
+    left, middle, right = (v % 26 for v in values)
+    return (left * 26 + middle) * 26 + right
+
+
+def _unpack(i: int) -> tuple[int, int, int]:
+    left, rest = divmod(i, 26 * 26)
+    middle, right = divmod(rest, 26)
+    return (left, middle, right)
+
+
+class KeySpace:
+    def __init__(
+        self,
+        rotor_names: Sequence[str] | None = None,
+        reflector_types: Sequence[str] | None = None,
+        allow_repeated_rotors: bool = False,
+    ) -> None:
+        self.rotor_names = [_value(i) for i in (rotor_names or REGISTRY.rotors)]
+        self.reflector_types = [
+            _value(i) for i in (reflector_types or REGISTRY.reflectors)
+        ]
+        self.allow_repeated_rotors = allow_repeated_rotors
+
+        if allow_repeated_rotors:
+            wheel_orders: Iterable[tuple[str, ...]] = itertools.product(
+                self.rotor_names, repeat=3
+            )
+        else:
+            wheel_orders = itertools.permutations(self.rotor_names, 3)
+        self.wheel_orders: list[tuple[str, ...]] = list(wheel_orders)
+        self._wheel_order_index = {w: i for i, w in enumerate(self.wheel_orders)}
+        self._reflector_index = {r: i for i, r in enumerate(self.reflector_types)}
+
+    def __len__(self) -> int:
+        return len(self.wheel_orders) * len(self.reflector_types) * POSITIONS ** 2
+
+    def describe(self) -> dict[str, Any]:
+        return {
+            "rotor_names": self.rotor_names,
+            "reflector_types": self.reflector_types,
+            "allow_repeated_rotors": self.allow_repeated_rotors,
+        }
+
+    def settings_at(self, index: int) -> KeySettings:
+        if not 0 <= index < len(self):
+            raise IndexError(f"Index {index} is outside of the keyspace.")
+
+        index, positions = divmod(index, POSITIONS)
+        index, ring_settings = divmod(index, POSITIONS)
+        wheel_order, reflector = divmod(index, len(self.reflector_types))
+
+        return KeySettings(
+            self.wheel_orders[wheel_order],  # type: ignore
+            self.reflector_types[reflector],
+            _unpack(ring_settings),
+            _unpack(positions),
+        )
+
+    def key_at(self, index: int) -> tuple[EnigmaKey, list[int]]:
+        settings = self.settings_at(index)
+        return settings.to_key(), list(settings.positions)
+
+    def index_of(
+        self,
+        key: EnigmaKey | KeySettings,
+        positions: Sequence[int] | str | None = None,
+    ) -> int:
+        if positions is None:
+            if not isinstance(key, KeySettings):
+                raise ValueError("Positions are required when indexing an EnigmaKey.")
+            positions = key.positions
+        if isinstance(positions, str):
+            positions = [char_to_int(c) for c in positions]
+
+        wheel_order = tuple(_value(i) for i in key.rotor_names)
+        reflector_type = _value(key.reflector_type)
+        try:
+            wheel_order_index = self._wheel_order_index[wheel_order]
+            reflector_index = self._reflector_index[reflector_type]
+        except KeyError:
+            raise ValueError(
+                f"{wheel_order} with reflector {reflector_type} is not in the keyspace."
+            )
+
+        index = wheel_order_index * len(self.reflector_types) + reflector_index
+        index = index * POSITIONS + _pack(key.ring_settings)
+        return index * POSITIONS + _pack(positions)
+
+    def shard(self, shard_index: int, shard_count: int) -> range:
+        if not 0 <= shard_index < shard_count:
+            raise ValueError(f"Shard {shard_index} is not in range 0-{shard_count}.")
+
+        size = len(self)
+        return range(
+            size * shard_index // shard_count,
+            size * (shard_index + 1) // shard_count,
+        )
+
+
+class Checkpoint:
+    def __init__(
+        self,
+        path: str | None,
+        keyspace: KeySpace,
+        shard_index: int = 0,
+        shard_count: int = 1,
+        keep: int = 10,
+        interval: float = 60.0,
+    ) -> None:
+        self.path = path
+        self.keyspace = keyspace
+        self.shard_index = shard_index
+        self.shard_count = shard_count
+        self.shard = keyspace.shard(shard_index, shard_count)
+        self.keep = keep
+        self.interval = interval
+
+        self.next_index = self.shard.start
+        self.best: TopK[int] = TopK(keep)
+        self._last_save = time.monotonic()
+
+        if path is not None and os.path.exists(path):
+            self.load()
+
+    @property
+    def remaining(self) -> range:
+        return range(self.next_index, self.shard.stop)
+
+    @property
+    def done(self) -> bool:
+        return self.next_index >= self.shard.stop
+
+    def state(self) -> dict[str, Any]:
+        return {
+            "keyspace": self.keyspace.describe(),
+            "shard": [self.shard_index, self.shard_count],
+            "next_index": self.next_index,
+            "best": self.best.results(),
+        }
+
+    def load(self) -> None:
+        assert self.path is not None
+        with open(self.path, "r") as f:
+            state = json.load(f)
+
+        if state["keyspace"] != self.keyspace.describe() or state["shard"] != [
+            self.shard_index,
+            self.shard_count,
+        ]:
+            raise RuntimeError(
+                f"Checkpoint {self.path} was written for a different keyspace or shard."
+            )
+
+        self.next_index = state["next_index"]
+        self.best = TopK(self.keep)
+        for score, index in state["best"]:
+            self.best.push(score, index)
+
+    def save(self) -> None:
+        self._last_save = time.monotonic()
+        if self.path is None:
+            return
+
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.state(), f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def update(self, index: int, score: float | None = None) -> None:
+        if score is not None:
+            self.best.push(score, index)
+
+        self.next_index = index + 1
+        if time.monotonic() - self._last_save >= self.interval:
+            self.save()
+
+    def results(self) -> list[tuple[float, KeySettings]]:
+        return [
+            (score, self.keyspace.settings_at(index))
+            for score, index in self.best.results()
+        ]
+
+
+def search(
+    keyspace: KeySpace,
+    score: Callable[[KeySettings], float],
+    shard_index: int = 0,
+    shard_count: int = 1,
+    checkpoint_path: str | None = None,
+    keep: int = 10,
+    interval: float = 60.0,
+    time_budget: float | None = None,
+    threshold: float | None = None,
+    progress: Callable[[ProgressReport], None] | None = None,
+) -> list[tuple[float, KeySettings]]:
+    checkpoint = Checkpoint(
+        checkpoint_path, keyspace, shard_index, shard_count, keep, interval
+    )
+    remaining = checkpoint.remaining
+    driver: SearchDriver[int] = SearchDriver(
+        total=len(remaining),
+        time_budget=time_budget,
+        threshold=threshold,
+        progress=progress,
+        top=checkpoint.best,
+    )
+
+    # Stopping early, including on Ctrl-C, keeps the checkpoint so the shard resumes
+    # where it left off.
+    try:
+        with driver:
+            for index in remaining:
+                running = driver.record(score(keyspace.settings_at(index)), index)
+                checkpoint.update(index)
+                if not running:
+                    break
+    finally:
+        checkpoint.save()
+
+    return checkpoint.results()
@@ -1,17 +1,29 @@
 from __future__ import annotations
 
 import argparse
+import os
 import sys
 from typing import Sequence
 
+from enigma_simulator import batch
+from enigma_simulator import files
+from enigma_simulator import metrics
 from enigma_simulator import output
+from enigma_simulator.backends import BACKENDS
+from enigma_simulator.backends import compile_enigma
+from enigma_simulator.backends import ENGINES
+from enigma_simulator.backends import select_backend
 from enigma_simulator.enigma import create_enigma_from_key
 from enigma_simulator.enigma import Enigma
 from enigma_simulator.key import load_key
+from enigma_simulator.registry import REGISTRY
 
 
 def main(argv: Sequence[str] | None = None) -> int:
     argv = argv if argv is not None else sys.argv[1:]
+    rotor_names = list(REGISTRY.rotors)
+    reflector_types = list(REGISTRY.reflectors)
+
     parser = argparse.ArgumentParser(
         prog="enigma-simulator",
         description=(
@@ -33,11 +45,11 @@ def main(argv: Sequence[str] | None = None) -> int:
         "--names",
         type=str,
         nargs=3,
-        choices=["I", "II", "III", "IV", "V", "VI", "VII", "VIII"],
+        choices=rotor_names,
         metavar=("rotor_name_1", "rotor_name_2", "rotor_name_3"),
         help=(
-            "List of the names of which 3 rotors to use. Should be one of: 'I', 'II', "
-            "'III', 'IV', 'V', 'VI', 'VII' or 'VIII'."
+            "List of the names of which 3 rotors to use. Should be one of: "
+            f"{', '.join(repr(i) for i in rotor_names)}."
         ),
     )
     parser.add_argument(
@@ -54,7 +66,7 @@ def main(argv: Sequence[str] | None = None) -> int:
         type=str,
         nargs="?",
         default="I",
-        choices=["A", "B", "C", "I"],
+        choices=reflector_types,
         help="Reflector type.",
     )
     parser.add_argument(
@@ -68,6 +80,26 @@ def main(argv: Sequence[str] | None = None) -> int:
             "letters A and B, and the letters C and D."
         ),
     )
+    parser.add_argument(
+        "-b",
+        "--backend",
+        type=str,
+        default="auto",
+        choices=BACKENDS,
+        help=(
+            "Execution backend. 'auto' picks one by message length, 'matrix' is the "
+            "reference implementation. Files and batches always use compiled tables."
+        ),
+    )
+
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help=(
+            "Print counters and timings (machines built, cache hits, characters and "
+            "time per backend) to stderr when done."
+        ),
+    )
 
     subparsers = parser.add_subparsers(help="sub-command help")
 
@@ -115,34 +147,123 @@ def main(argv: Sequence[str] | None = None) -> int:
     group.add_argument("--encrypt", action="store_true", help="Encryption mode.")
     group.add_argument("--decrypt", action="store_false", help="Decryption mode.")
 
+    file_parser = subparsers.add_parser(
+        "file",
+        help="Encrypt or decrypt a file. Letters are upper cased, other bytes are kept.",
+    )
+    file_parser.add_argument(
+        "-p",
+        "--positions",
+        type=str,
+        nargs="?",
+        help="Positions of the 3 rotors. Should be a 3-length string, e.g. 'ABC'.",
+    )
+    file_parser.add_argument(
+        "-w",
+        "--window-size",
+        type=int,
+        default=files.WINDOW_SIZE,
+        help="Number of bytes processed at a time.",
+    )
+    file_parser.add_argument("input_file", type=str, help="File to encrypt/decrypt.")
+    file_parser.add_argument(
+        "output_file",
+        type=str,
+        help="File to write to. Created or overwritten with the same length as input.",
+    )
+
+    batch_parser = subparsers.add_parser(
+        "batch",
+        help=(
+            "Run newline-delimited JSON jobs and write JSON results in input order. "
+            "See README for the job format."
+        ),
+    )
+    batch_parser.add_argument(
+        "input_file",
+        type=str,
+        nargs="?",
+        default="-",
+        help="File of JSON jobs, one per line. Reads stdin if omitted or '-'.",
+    )
+    batch_parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=None,
+        help=(
+            "Number of worker processes. Defaults to the number of CPUs, used only "
+            "for windows large enough to be worth sending to the pool."
+        ),
+    )
+    batch_parser.add_argument(
+        "--window-size",
+        type=int,
+        default=batch.WINDOW_SIZE,
+        help="Maximum number of jobs read ahead of the output.",
+    )
+
     args = parser.parse_args(argv)
 
+    if not args.profile:
+        return run(args)
+
+    metrics.reset()
+    try:
+        with metrics.timer("cli.total"):
+            return run(args)
+    finally:
+        output.write_line(metrics.format_stats(), sys.stderr.buffer)
+
+
+def run(args: argparse.Namespace) -> int:
+    if "jobs" in args:  # batch
+        backend = args.backend if args.backend in ENGINES else "auto"
+        if args.input_file == "-":
+            batch.run_batch(
+                sys.stdin, sys.stdout.buffer, args.jobs, args.window_size, backend
+            )
+        else:
+            with open(args.input_file, "r") as f:
+                batch.run_batch(
+                    f, sys.stdout.buffer, args.jobs, args.window_size, backend
+                )
+        return 0
+
+    positions = (
+        list(args.positions[0] if isinstance(args.positions, list) else args.positions)
+        if args.positions is not None
+        else ["A", "A", "A"]
+    )
     if args.key:
         enigma_key = load_key(args.key[0])
-        enigma = create_enigma_from_key(enigma_key)
+        enigma = create_enigma_from_key(enigma_key, positions, args.backend)
 
     else:
-        positions = (
-            list(
-                args.positions[0]
-                if isinstance(args.positions, list)
-                else args.positions
-            )
-            if args.positions is not None
-            else ["A", "A", "A"]
-        )
         enigma = Enigma(
             args.names,
             args.settings,
             args.reflector,
             args.connections,
             positions,
+            args.backend,
+        )
+
+    if "input_file" in args:  # file
+        backend = args.backend
+        if backend not in ENGINES:
+            backend = select_backend(os.path.getsize(args.input_file))
+        files.encrypt_file(
+            compile_enigma(enigma, backend),
+            args.input_file,
+            args.output_file,
+            args.window_size,
         )
+        return 0
 
     message = " ".join(args.message)
 
     if "encrypt" in args:  # transmission
-        print(args.positions, args.message_key, message)
         if args.encrypt:
             output.write_line(
                 " ".join(
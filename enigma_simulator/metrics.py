@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import contextlib
+import time
+from typing import Any
+from typing import Callable
+from typing import Iterator
+
+import numpy as np
+
+# Upper bounds, in seconds, of the timing histogram buckets: powers of two from about
+# a microsecond to a minute, plus one open-ended bucket.
+BUCKETS = 2.0 ** np.arange(-20, 7)
+
+
+class Histogram:
+    def __init__(self) -> None:
+        self.counts = np.zeros(len(BUCKETS) + 1, dtype=np.int64)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds: float) -> None:
+        self.counts[np.searchsorted(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.total / self.count if self.count else 0.0,
+            "max": self.max,
+            "buckets": {
+                float(bound): int(count)
+                for bound, count in zip(np.append(BUCKETS, np.inf), self.counts)
+                if count
+            },
+        }
+
+
+# Metrics are kept per process; work done in pool workers isn't counted here.
+_COUNTERS: dict[str, int] = {}
+_TIMINGS: dict[str, Histogram] = {}
+_CALLBACKS: list[Callable[[str, float], None]] = []
+
+
+def increment(name: str, n: int = 1) -> None:
+    _COUNTERS[name] = _COUNTERS.get(name, 0) + n
+    if _CALLBACKS:
+        for callback in _CALLBACKS:
+            callback(name, n)
+
+
+def record_time(name: str, seconds: float) -> None:
+    if name not in _TIMINGS:
+        _TIMINGS[name] = Histogram()
+    _TIMINGS[name].add(seconds)
+    if _CALLBACKS:
+        for callback in _CALLBACKS:
+            callback(name, seconds)
+
+
+@contextlib.contextmanager
+def timer(name: str) -> Iterator[None]:
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_time(name, time.perf_counter() - t0)
+
+
+def add_callback(callback: Callable[[str, float], None]) -> None:
+    # Called with (name, value) for every counter increment and timing.
+    _CALLBACKS.append(callback)
+
+
+def remove_callback(callback: Callable[[str, float], None]) -> None:
+    _CALLBACKS.remove(callback)
+
+
+def get_stats() -> dict[str, Any]:
+    return {
+        "counters": dict(sorted(_COUNTERS.items())),
+        "timings": {name: _TIMINGS[name].summary() for name in sorted(_TIMINGS)},
+    }
+
+
+def reset() -> None:
+    _COUNTERS.clear()
+    _TIMINGS.clear()
+
+
+def format_stats(stats: dict[str, Any] | None = None) -> str:
+    stats = stats if stats is not None else get_stats()
+    lines = [f"{name:<32} {value:>12,}" for name, value in stats["counters"].items()]
+    for name, timing in stats["timings"].items():
+        lines.append(
+            f"{name:<32} {timing['count']:>12,} calls "
+            f"{timing['total'] * 1e3:10.3f}ms total "
+            f"{timing['mean'] * 1e6:10.1f}us mean "
+            f"{timing['max'] * 1e3:10.3f}ms max"
+        )
+    return "\n".join(lines)
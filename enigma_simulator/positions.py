@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+from typing import Callable
+from typing import Iterator
+
+import numpy as np
+
+from enigma_simulator.engine import CompiledEnigma
+from enigma_simulator.keyspace import POSITIONS
+from enigma_simulator.search import SearchDriver
+from enigma_simulator.search import SearchResult
+from enigma_simulator.stats import text_to_ints
+from enigma_simulator.utils import int_to_char
+
+BLOCK_SIZE = 1024
+
+
+def _ciphertext_ints(ciphertext: str | bytes | np.ndarray) -> np.ndarray:
+    if isinstance(ciphertext, np.ndarray):
+        return ciphertext.astype(np.uint8, copy=False)
+    return text_to_ints(ciphertext)
+
+
+class PositionDecryptor:
+    def __init__(
+        self, machine: CompiledEnigma, ciphertext: str | bytes | np.ndarray
+    ) -> None:
+        # Only letters are decrypted; the machine's own rotor positions are ignored.
+        self.ints = _ciphertext_ints(ciphertext)
+        self.plugboard = machine.plugboard
+        self.tables = machine.composite_tables()
+        self.successors = machine.successors()
+
+    def __len__(self) -> int:
+        return POSITIONS
+
+    def decrypt(
+        self, start: int = 0, stop: int = POSITIONS, out: np.ndarray | None = None
+    ) -> np.ndarray:
+        if not 0 <= start <= stop <= POSITIONS:
+            raise ValueError(f"Invalid position range {start}:{stop}.")
+
+        shape = (stop - start, len(self.ints))
+        if out is None:
+            out = np.empty(shape, dtype=np.uint8)
+        elif out.shape != shape:
+            raise ValueError(f"Expected an output of shape {shape}, got {out.shape}.")
+
+        # Every row walks the same stepping schedule from its own start position, so
+        # each keypress is one gather from the composite tables over the whole block.
+        x = self.plugboard[self.ints]
+        positions = np.arange(start, stop)
+        for k in range(len(x)):
+            positions = self.successors[positions]
+            out[:, k] = self.tables[positions, x[k]]
+
+        return np.take(self.plugboard, out, out=out)
+
+    def blocks(self, block_size: int = BLOCK_SIZE) -> Iterator[tuple[int, np.ndarray]]:
+        if block_size < 1:
+            raise ValueError("Block size must be positive.")
+
+        for start in range(0, POSITIONS, block_size):
+            yield start, self.decrypt(start, min(start + block_size, POSITIONS))
+
+
+def decrypt_all_positions(
+    machine: CompiledEnigma,
+    ciphertext: str | bytes | np.ndarray,
+    out: np.ndarray | None = None,
+) -> np.ndarray:
+    return PositionDecryptor(machine, ciphertext).decrypt(out=out)
+
+
+def iter_position_blocks(
+    machine: CompiledEnigma,
+    ciphertext: str | bytes | np.ndarray,
+    block_size: int = BLOCK_SIZE,
+) -> Iterator[tuple[int, np.ndarray]]:
+    return PositionDecryptor(machine, ciphertext).blocks(block_size)
+
+
+def search_positions(
+    machine: CompiledEnigma,
+    ciphertext: str | bytes | np.ndarray,
+    score: Callable[[np.ndarray], np.ndarray],
+    block_size: int = BLOCK_SIZE,
+    driver: SearchDriver[int] | None = None,
+) -> SearchResult:
+    # score maps a block of decryptions (rows, L) to one score per row. Results are
+    # keyed by start position, e.g. "AQZ".
+    driver = driver if driver is not None else SearchDriver(total=POSITIONS)
+    with driver:
+        for start, block in iter_position_blocks(machine, ciphertext, block_size):
+            if not driver.record_many(score(block), range(start, start + len(block))):
+                break
+
+    result = driver.result()
+    return result._replace(
+        results=[(s, position_string(index)) for s, index in result.results]
+    )
+
+
+def position_string(index: int) -> str:
+    return "".join(int_to_char(int(i)) for i in np.unravel_index(index, (26, 26, 26)))
@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import json
+import os
+from typing import Any
+from typing import NamedTuple
+from typing import Sequence
+
+import numpy as np
+import yaml
+
+from enigma_simulator.utils import char_to_int
+
+ALPHABET = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+WIRINGS_ENV_VAR = "ENIGMA_SIMULATOR_WIRINGS"
+
+
+class RotorWiring(NamedTuple):
+    name: str
+    encoding: str
+    notch_positions: list[str]
+    turnover_positions: tuple[int, ...]
+    # forward[(position - ring_setting) % 26, letter], backward is its inverse.
+    forward: np.ndarray
+    backward: np.ndarray
+
+    def tables(self, ring_setting: int) -> tuple[np.ndarray, np.ndarray]:
+        shifts = (np.arange(26) - ring_setting) % 26
+        return self.forward[shifts], self.backward[shifts]
+
+
+class ReflectorWiring(NamedTuple):
+    name: str
+    encoding: str
+    table: np.ndarray
+
+
+def encoding_to_permutation(encoding: str) -> np.ndarray:
+    if len(encoding) != 26:
+        raise RuntimeError(f"Encoding should have 26 characters, not {len(encoding)}.")
+    if set(encoding.upper()) != set(ALPHABET):
+        raise RuntimeError(f"Encoding {encoding} is not a permutation of the alphabet.")
+
+    return np.array([char_to_int(c) for c in encoding], dtype=np.uint8)
+
+
+def compile_rotor(encoding: str) -> tuple[np.ndarray, np.ndarray]:
+    permutation = encoding_to_permutation(encoding).astype(np.int64)
+    shifts = np.arange(26)[:, None]
+    letters = np.arange(26)[None, :]
+
+    forward = ((permutation[(letters + shifts) % 26] - shifts) % 26).astype(np.uint8)
+    backward = np.argsort(forward, axis=1).astype(np.uint8)
+    return forward, backward
+
+
+class Registry:
+    def __init__(self) -> None:
+        self.rotors: dict[str, RotorWiring] = {}
+        self.reflectors: dict[str, ReflectorWiring] = {}
+        self.thin_wheels: dict[str, RotorWiring] = {}
+        # Bumped on every registration so caches keyed by it never serve a wiring
+        # that has since been replaced.
+        self.version = 0
+
+    def register_rotor(
+        self, name: str, encoding: str, notch_positions: Sequence[str]
+    ) -> RotorWiring:
+        if any(len(n) != 1 or n.upper() not in ALPHABET for n in notch_positions):
+            raise RuntimeError(f"Invalid notch positions {notch_positions} for {name}.")
+
+        forward, backward = compile_rotor(encoding)
+        self.version += 1
+        self.rotors[name] = RotorWiring(
+            name,
+            encoding,
+            list(notch_positions),
+            tuple((char_to_int(n) - 1) % 26 for n in notch_positions),
+            forward,
+            backward,
+        )
+        return self.rotors[name]
+
+    def register_thin_wheel(self, name: str, encoding: str) -> RotorWiring:
+        forward, backward = compile_rotor(encoding)
+        self.version += 1
+        self.thin_wheels[name] = RotorWiring(name, encoding, [], (), forward, backward)
+        return self.thin_wheels[name]
+
+    def register_reflector(
+        self, name: str, encoding: str, allow_fixed_points: bool = False
+    ) -> ReflectorWiring:
+        table = encoding_to_permutation(encoding)
+        letters = np.arange(26)
+
+        if not np.array_equal(table[table], letters):
+            raise RuntimeError(f"Reflector {name} is not an involution.")
+        if not allow_fixed_points and np.any(table == letters):
+            raise RuntimeError(f"Reflector {name} maps a letter to itself.")
+
+        self.version += 1
+        self.reflectors[name] = ReflectorWiring(name, encoding, table)
+        return self.reflectors[name]
+
+    def rotor(self, name: str) -> RotorWiring:
+        try:
+            return self.rotors[name]
+        except KeyError:
+            raise KeyError(
+                f"Unknown rotor {name!r}. Should be one of: {', '.join(self.rotors)}."
+            )
+
+    def reflector(self, name: str) -> ReflectorWiring:
+        try:
+            return self.reflectors[name]
+        except KeyError:
+            raise KeyError(
+                f"Unknown reflector {name!r}. Should be one of: "
+                f"{', '.join(self.reflectors)}."
+            )
+
+    def update(self, wirings: dict[str, Any]) -> None:
+        for name, attrs in wirings.get("rotors", {}).items():
+            self.register_rotor(name, attrs["encoding"], attrs["notch_positions"])
+        for name, attrs in wirings.get("thin_wheels", {}).items():
+            encoding = attrs["encoding"] if isinstance(attrs, dict) else attrs
+            self.register_thin_wheel(name, encoding)
+        for name, attrs in wirings.get("reflectors", {}).items():
+            encoding = attrs["encoding"] if isinstance(attrs, dict) else attrs
+            self.register_reflector(name, encoding)
+
+    def load(self, file_path: str) -> None:
+        with open(file_path, "r") as f:
+            if file_path[-5:] == ".json":
+                wirings = json.load(f)
+            elif file_path[-5:] == ".yaml" or file_path[-4:] == ".yml":
+                wirings = yaml.safe_load(f)
+            else:
+                raise NotImplementedError
+
+        self.update(wirings)
+
+
+REGISTRY = Registry()
+REGISTRY.update(
+    {
+        "rotors": {
+            "I": {"encoding": "EKMFLGDQVZNTOWYHXUSPAIBRCJ", "notch_positions": ["R"]},
+            "II": {"encoding": "AJDKSIRUXBLHWTMCQGZNPYFVOE", "notch_positions": ["F"]},
+            "III": {
+                "encoding": "BDFHJLCPRTXVZNYEIWGAKMUSQO",
+                "notch_positions": ["W"],
+            },
+            "IV": {"encoding": "ESOVPZJAYQUIRHXLNFTGKDCMWB", "notch_positions": ["K"]},
+            "V": {"encoding": "VZBRGITYUPSDNHLXAWMJQOFECK", "notch_positions": ["A"]},
+            "VI": {
+                "encoding": "JPGVOUMFYQBENHZRDKASXLICTW",
+                "notch_positions": ["A", "N"],
+            },
+            "VII": {
+                "encoding": "NZJHGRCXMYSWBOUFAIVLPEKQDT",
+                "notch_positions": ["A", "N"],
+            },
+            "VIII": {
+                "encoding": "FKQHTLXOCBJSPDZRAMEWNIUYGV",
+                "notch_positions": ["A", "N"],
+            },
+        },
+        "thin_wheels": {
+            "Beta": "LEYJVCNIXWPBQMDRTAKZGFUHOS",
+            "Gamma": "FSOKANUERHMBTIYCWLQPZXVGJD",
+        },
+        "reflectors": {
+            "A": "EJMZALYXVBWFCRQUONTSPIKHGD",
+            "B": "YRUHQSLDPXNGOKMIEBFZCWVJAT",
+            "C": "FVPJIAOYEDRZXWGCTKUQSBNMHL",
+        },
+    }
+)
+# Identity reflector, kept for testing and as the fallback of get_reflector.
+REGISTRY.register_reflector("I", ALPHABET, allow_fixed_points=True)
+
+for _path in filter(None, os.environ.get(WIRINGS_ENV_VAR, "").split(os.pathsep)):
+    REGISTRY.load(_path)
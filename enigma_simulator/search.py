@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import heapq
+import itertools
+import math
+import sys
+import time
+from types import TracebackType
+from typing import Any
+from typing import Callable
+from typing import Generic
+from typing import Iterable
+from typing import NamedTuple
+from typing import Sequence
+from typing import TypeVar
+
+import numpy as np
+
+from enigma_simulator import output
+
+T = TypeVar("T")
+
+
+class TopK(Generic[T]):
+    def __init__(self, k: int) -> None:
+        if k < 1:
+            raise ValueError("Must keep at least one result.")
+        self.k = k
+        # (score, tie-break, item): the counter keeps items from ever being compared.
+        self._heap: list[tuple[float, int, T]] = []
+        self._counter = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    @property
+    def threshold(self) -> float:
+        # Score a candidate has to beat to get in.
+        return self._heap[0][0] if len(self._heap) == self.k else -math.inf
+
+    def push(self, score: float, item: T) -> bool:
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, (score, next(self._counter), item))
+            return True
+        elif score > self._heap[0][0]:
+            heapq.heapreplace(self._heap, (score, next(self._counter), item))
+            return True
+        return False
+
+    def push_many(self, scores: np.ndarray, items: Sequence[T]) -> None:
+        # Only the candidates that can still get in reach the Python-level heap.
+        scores = np.asarray(scores)
+        candidates = np.flatnonzero(scores > self.threshold)
+        if len(candidates) > self.k:
+            candidates = candidates[np.argsort(scores[candidates])[-self.k :]]
+        for i in candidates:
+            self.push(float(scores[i]), items[int(i)])
+
+    def best(self) -> tuple[float, T] | None:
+        results = self.results()
+        return results[0] if results else None
+
+    def results(self) -> list[tuple[float, T]]:
+        return [
+            (score, item)
+            for score, _, item in sorted(self._heap, key=lambda x: (-x[0], x[1]))
+        ]
+
+
+class ProgressReport(NamedTuple):
+    done: int
+    total: int | None
+    elapsed: float
+    rate: float
+    eta: float | None
+
+    def __str__(self) -> str:
+        if self.total:
+            done = f"{self.done:,}/{self.total:,} ({100 * self.done / self.total:.1f}%)"
+        else:
+            done = f"{self.done:,}"
+        eta = "" if self.eta is None else f" ETA {_format_seconds(self.eta)}"
+        return f"{done} {self.rate:,.0f}/s{eta}"
+
+
+def _format_seconds(seconds: float) -> str:
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02}:{seconds:02}"
+
+
+def print_progress(report: ProgressReport) -> None:
+    output.write_line(str(report), sys.stderr.buffer)
+
+
+class Progress:
+    def __init__(
+        self,
+        total: int | None = None,
+        callback: Callable[[ProgressReport], None] | None = print_progress,
+        interval: float = 1.0,
+    ) -> None:
+        self.total = total
+        self.callback = callback
+        self.interval = interval
+        self.done = 0
+        self.start = self.now = time.monotonic()
+        self._next_report = self.start + interval
+        # The clock is only read every `_stride` updates; the stride adapts so it is
+        # read about a hundred times a second however cheap each update is.
+        self._stride = 1
+        self._next_check = 1
+
+    def report(self) -> ProgressReport:
+        elapsed = self.now - self.start
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        eta = None
+        if self.total is not None and rate > 0:
+            eta = max(self.total - self.done, 0) / rate
+        return ProgressReport(self.done, self.total, elapsed, rate, eta)
+
+    def tick(self) -> None:
+        last, self.now = self.now, time.monotonic()
+        elapsed = self.now - last
+        if elapsed < 0.005:
+            self._stride *= 2
+        else:
+            self._stride = max(
+                1, min(2 * self._stride, int(self._stride / elapsed / 100))
+            )
+        self._next_check = self.done + self._stride
+
+        if self.callback is not None and self.now >= self._next_report:
+            self._next_report = self.now + self.interval
+            self.callback(self.report())
+
+    def update(self, n: int = 1) -> None:
+        self.done += n
+        if self.done >= self._next_check:
+            self.tick()
+
+
+class SearchResult(NamedTuple):
+    results: list[tuple[float, Any]]
+    done: int
+    elapsed: float
+    reason: str
+
+
+class SearchDriver(Generic[T]):
+    # Keeps the best results of a search, reports progress and decides when to stop.
+    # Attack loops stop once record returns False. As a context manager, Ctrl-C ends
+    # the search but keeps the results so far.
+
+    def __init__(
+        self,
+        keep: int = 10,
+        total: int | None = None,
+        time_budget: float | None = None,
+        threshold: float | None = None,
+        progress: Callable[[ProgressReport], None] | None = None,
+        interval: float = 1.0,
+        top: TopK[T] | None = None,
+    ) -> None:
+        self.top: TopK[T] = top if top is not None else TopK(keep)
+        self.progress = Progress(total, progress, interval)
+        self.threshold = threshold
+        self.deadline = (
+            math.inf if time_budget is None else self.progress.start + time_budget
+        )
+        self.reason: str | None = None
+
+    def __enter__(self) -> SearchDriver[T]:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> bool:
+        if exc_type is KeyboardInterrupt:
+            self.reason = "interrupted"
+            return True
+        return False
+
+    @property
+    def stopped(self) -> bool:
+        # Uses the last clock reading taken by the progress counter.
+        if self.reason is None and self.progress.now >= self.deadline:
+            self.reason = "time"
+        return self.reason is not None
+
+    def _check_threshold(self, score: float) -> None:
+        if self.threshold is not None and score >= self.threshold:
+            self.reason = "threshold"
+
+    def record(self, score: float | None, item: T, n: int = 1) -> bool:
+        if score is not None:
+            self.top.push(score, item)
+            self._check_threshold(score)
+        self.progress.update(n)
+        return not self.stopped
+
+    def record_many(self, scores: np.ndarray, items: Sequence[T]) -> bool:
+        scores = np.asarray(scores)
+        self.top.push_many(scores, items)
+        if len(scores):
+            self._check_threshold(float(scores.max()))
+        self.progress.update(len(scores))
+        return not self.stopped
+
+    def result(self) -> SearchResult:
+        self.progress.tick()
+        return SearchResult(
+            self.top.results(),
+            self.progress.done,
+            self.progress.report().elapsed,
+            self.reason or "exhausted",
+        )
+
+    def run(self, candidates: Iterable[T], score: Callable[[T], float]) -> SearchResult:
+        with self:
+            for candidate in candidates:
+                if not self.record(score(candidate), candidate):
+                    break
+        return self.result()
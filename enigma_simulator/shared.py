@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import sys
+import weakref
+from collections import OrderedDict
+from multiprocessing import util
+from typing import Any
+from typing import NamedTuple
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:  # pragma: no cover (python 3.7)
+    shared_memory = None  # type: ignore
+
+if TYPE_CHECKING:  # pragma: no cover
+    from enigma_simulator.engine import ScramblerCore
+
+AVAILABLE = shared_memory is not None
+# Offsets of each array in a segment are rounded up to this many bytes.
+ALIGNMENT = 64
+
+
+class ArrayLayout(NamedTuple):
+    key: str
+    dtype: str
+    shape: tuple[int, ...]
+    offset: int
+
+
+class Handle(NamedTuple):
+    # What a worker needs to find a published set of arrays: small and picklable.
+    segment: str
+    layout: tuple[ArrayLayout, ...]
+
+
+def _segment(name: str | None, size: int = 0) -> Any:
+    kwargs: dict[str, Any] = {}
+    if sys.version_info >= (3, 13):  # pragma: no cover
+        # Only the publisher should unlink segments, not the resource tracker of
+        # every worker that attached to them.
+        kwargs["track"] = name is None
+    if name is None:
+        return shared_memory.SharedMemory(create=True, size=max(size, 1), **kwargs)
+    return shared_memory.SharedMemory(name=name, **kwargs)
+
+
+def _views(segment: Any, handle: Handle) -> dict[str, np.ndarray]:
+    views = {}
+    for key, dtype, shape, offset in handle.layout:
+        view = np.ndarray(shape, dtype=dtype, buffer=segment.buf, offset=offset)
+        view.flags.writeable = False
+        views[key] = view
+    return views
+
+
+class SharedRegistry:
+    # Segments published by this process, by segment name. Every segment is unlinked
+    # by close, which also runs when the process exits.
+
+    def __init__(self) -> None:
+        self._segments: dict[str, tuple[Any, Handle]] = {}
+        self._finalizer = util.Finalize(self, self.close, exitpriority=10)
+
+    def __contains__(self, segment: str) -> bool:
+        return segment in self._segments
+
+    def __len__(self) -> int:
+        return len(self._segments)
+
+    def publish(self, arrays: dict[str, np.ndarray]) -> Handle:
+        if not AVAILABLE:
+            raise RuntimeError("Shared memory needs Python 3.8 or later.")
+
+        layout = []
+        size = 0
+        for key, array in arrays.items():
+            layout.append(ArrayLayout(key, array.dtype.str, array.shape, size))
+            size += -(-array.nbytes // ALIGNMENT) * ALIGNMENT
+
+        segment = _segment(None, size)
+        handle = Handle(segment.name, tuple(layout))
+        for key, view in _views(segment, handle).items():
+            view.flags.writeable = True
+            view[...] = arrays[key]
+
+        self._segments[segment.name] = (segment, handle)
+        return handle
+
+    def unpublish(self, segment_name: str) -> None:
+        if segment_name in self._segments:
+            segment, _ = self._segments.pop(segment_name)
+            segment.close()
+            segment.unlink()
+
+    def close(self) -> None:
+        for segment_name in list(self._segments):
+            self.unpublish(segment_name)
+
+
+REGISTRY = SharedRegistry()
+# Most segments a worker keeps attached. Publishers unlink segments without telling
+# workers, so the least recently used ones are detached to keep memory flat.
+MAX_ATTACHED = 16
+# Segments this process attached to, least recently used first, and the cores built
+# on them.
+_ATTACHED: OrderedDict[str, tuple[Any, dict[str, np.ndarray]]] = OrderedDict()
+_CORES: dict[str, ScramblerCore] = {}
+# Detached segments whose views were still in use, closed once they no longer are.
+_DETACHED: list[Any] = []
+
+
+def _close(segments: list[Any]) -> list[Any]:
+    # Returns the segments that can't be closed yet.
+    still_open = []
+    for segment in segments:
+        try:
+            segment.close()
+        except BufferError:
+            still_open.append(segment)
+    return still_open
+
+
+def detach(segment_name: str) -> None:
+    _CORES.pop(segment_name, None)
+    if segment_name in _ATTACHED:
+        segment, views = _ATTACHED.pop(segment_name)
+        views.clear()
+        _DETACHED.append(segment)
+    _DETACHED[:] = _close(_DETACHED)
+
+
+def attach(handle: Handle) -> dict[str, np.ndarray]:
+    # Read-only views straight onto the shared segment; nothing is copied.
+    if handle.segment in _ATTACHED:
+        _ATTACHED.move_to_end(handle.segment)
+    else:
+        segment = _segment(handle.segment)
+        _ATTACHED[handle.segment] = (segment, _views(segment, handle))
+        while len(_ATTACHED) > MAX_ATTACHED:
+            detach(next(iter(_ATTACHED)))
+    return _ATTACHED[handle.segment][1]
+
+
+def detach_all() -> None:
+    for segment_name in list(_ATTACHED):
+        detach(segment_name)
+
+
+util.Finalize(None, detach_all, exitpriority=20)
+
+CORE_TABLES = ("forward", "backward", "reflector", "notches")
+
+
+def publish_core(core: ScramblerCore, composite: bool = False) -> Handle | None:
+    # Once published, pickling the core sends a handle instead of the tables. The
+    # segment is unlinked when the core is garbage collected. Without shared memory
+    # this returns None and cores keep being pickled whole.
+    if not AVAILABLE:  # pragma: no cover
+        return None
+
+    if core.handle is not None:
+        published = {key for key, _, _, _ in core.handle.layout}
+        if not composite or "composite" in published:
+            return core.handle
+        REGISTRY.unpublish(core.handle.segment)
+
+    arrays = {key: getattr(core, key) for key in CORE_TABLES}
+    if composite:
+        arrays["composite"] = core.composite_tables()
+        arrays["successors"] = core.successors()
+
+    core.handle = REGISTRY.publish(arrays)
+    weakref.finalize(core, REGISTRY.unpublish, core.handle.segment)
+    return core.handle
+
+
+def attach_core(handle: Handle) -> ScramblerCore:
+    from enigma_simulator.engine import ScramblerCore
+
+    views = attach(handle)
+    if handle.segment not in _CORES:
+        core = ScramblerCore.from_tables(**views)
+        core.handle = handle
+        _CORES[handle.segment] = core
+    return _CORES[handle.segment]
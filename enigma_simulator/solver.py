@@ -0,0 +1,416 @@
+from __future__ import annotations
+
+import math
+import multiprocessing
+import queue
+import time
+from concurrent.futures import Future
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+from typing import Callable
+from typing import NamedTuple
+from typing import Sequence
+
+import numpy as np
+
+from enigma_simulator.engine import CompiledEnigma
+from enigma_simulator.key import EnigmaKey
+from enigma_simulator.registry import REGISTRY
+from enigma_simulator.search import ProgressReport
+from enigma_simulator.search import SearchDriver
+from enigma_simulator.stats import text_to_ints
+from enigma_simulator.utils import int_to_char
+
+
+class NgramScorer:
+    def __init__(self, log_probabilities: np.ndarray, n: int) -> None:
+        self.n = n
+        self.table = log_probabilities.astype(np.float32)
+        self.powers = 26 ** np.arange(n - 1, -1, -1)
+
+    @classmethod
+    def from_counts(cls, counts: dict[str, int]) -> NgramScorer:
+        n = len(next(iter(counts)))
+        table = np.zeros(26 ** n)
+        for ngram, count in counts.items():
+            table[
+                int(np.dot(text_to_ints(ngram), 26 ** np.arange(n - 1, -1, -1)))
+            ] = count
+
+        total = table.sum()
+        floor = math.log10(0.01 / total)
+        with np.errstate(divide="ignore"):
+            log_probabilities = np.where(table > 0, np.log10(table / total), floor)
+        return cls(log_probabilities, n)
+
+    @classmethod
+    def from_text(cls, text: str, n: int = 3) -> NgramScorer:
+        ints = text_to_ints(text).astype(np.int64)
+        indices = sum(
+            ints[i : len(ints) - n + 1 + i] * 26 ** (n - 1 - i) for i in range(n)
+        )
+        counts = np.bincount(indices, minlength=26 ** n)
+        return cls.from_counts(
+            {
+                "".join(int_to_char(int(d)) for d in np.unravel_index(i, (26,) * n)): c
+                for i, c in enumerate(counts)
+                if c
+            }
+        )
+
+    @classmethod
+    def load(cls, file_path: str) -> NgramScorer:
+        # One "NGRAM COUNT" pair per line, as in the usual published n-gram lists.
+        with open(file_path, "r") as f:
+            counts = {
+                ngram.upper(): int(count)
+                for ngram, count in (line.split() for line in f if line.strip())
+            }
+        return cls.from_counts(counts)
+
+    def __call__(self, ints: np.ndarray) -> float:
+        if len(ints) < self.n:
+            return 0.0
+
+        indices = sum(
+            ints[i : len(ints) - self.n + 1 + i].astype(np.int64) * int(p)
+            for i, p in enumerate(self.powers)
+        )
+        return float(self.table[indices].sum())
+
+
+class Schedule(NamedTuple):
+    start: float = 10.0
+    end: float = 0.1
+    kind: str = "exponential"
+
+    def temperature(self, progress: float) -> float:
+        if self.kind == "exponential":
+            return self.start * (self.end / self.start) ** progress
+        elif self.kind == "linear":
+            return self.start + (self.end - self.start) * progress
+        else:
+            raise ValueError(f"Unknown schedule {self.kind!r}.")
+
+
+class State(NamedTuple):
+    rotor_names: tuple[str, ...]
+    ring_settings: tuple[int, ...]
+    positions: tuple[int, ...]
+    plugboard: np.ndarray
+
+    @property
+    def plugboard_connections(self) -> str:
+        return " ".join(
+            int_to_char(a) + int_to_char(int(b))
+            for a, b in enumerate(self.plugboard)
+            if a < b
+        )
+
+
+class SolverResult(NamedTuple):
+    key: EnigmaKey
+    positions: str
+    score: float
+    plaintext: str
+
+
+def random_state(
+    rng: np.random.Generator, rotor_names: Sequence[str], plugs: int
+) -> State:
+    plugboard = np.arange(26, dtype=np.uint8)
+    letters = rng.permutation(26)[: 2 * plugs]
+    plugboard[letters[0::2]] = letters[1::2]
+    plugboard[letters[1::2]] = letters[0::2]
+
+    return State(
+        tuple(rng.choice(list(rotor_names), size=3, replace=False).tolist()),
+        tuple(rng.integers(0, 26, size=3).tolist()),
+        tuple(rng.integers(0, 26, size=3).tolist()),
+        plugboard,
+    )
+
+
+def scramblers(state: State, reflector_type: str, length: int) -> np.ndarray:
+    machine = CompiledEnigma.from_settings(
+        state.rotor_names, state.ring_settings, reflector_type, "", state.positions
+    )
+    return machine.scramblers(length)
+
+
+def decrypt(
+    scrambler: np.ndarray, plugboard: np.ndarray, ints: np.ndarray
+) -> np.ndarray:
+    return plugboard[scrambler[np.arange(len(ints)), plugboard[ints]]]
+
+
+def move_plugboard(
+    rng: np.random.Generator, plugboard: np.ndarray, plugs: int
+) -> np.ndarray:
+    plugboard = plugboard.copy()
+    a, b = (int(i) for i in rng.choice(26, size=2, replace=False))
+    a_mate, b_mate = int(plugboard[a]), int(plugboard[b])
+    plugged = int((plugboard != np.arange(26)).sum()) // 2
+
+    if a_mate == b:  # unplug a-b
+        plugboard[a], plugboard[b] = a, b
+    elif a_mate == a and b_mate == b:  # plug a-b
+        if plugged >= plugs:
+            return plugboard
+        plugboard[a], plugboard[b] = b, a
+    else:  # rewire whichever of a and b are plugged so that a-b are together
+        plugboard[a_mate], plugboard[b_mate] = a_mate, b_mate
+        if a_mate != a and b_mate != b:
+            plugboard[a_mate], plugboard[b_mate] = b_mate, a_mate
+        plugboard[a], plugboard[b] = b, a
+
+    return plugboard
+
+
+def move_rotors(
+    rng: np.random.Generator, state: State, rotor_names: Sequence[str]
+) -> State:
+    i = int(rng.integers(0, 3))
+    kind = rng.integers(0, 4)
+    ring_settings, positions = list(state.ring_settings), list(state.positions)
+
+    if kind == 0:
+        # Turning ring and position together keeps the wiring offset and only moves
+        # the turnover, which is the gentlest move there is.
+        delta = int(rng.choice([-1, 1]))
+        ring_settings[i] = (ring_settings[i] + delta) % 26
+        positions[i] = (positions[i] + delta) % 26
+    elif kind == 1:
+        positions[i] = (positions[i] + int(rng.integers(1, 26))) % 26
+    elif kind == 2:
+        ring_settings[i] = (ring_settings[i] + int(rng.integers(1, 26))) % 26
+    else:
+        names = list(state.rotor_names)
+        other = [n for n in rotor_names if n not in names]
+        j = int(rng.integers(0, 3))
+        if other and rng.random() < 0.5:
+            names[i] = str(rng.choice(other))
+        else:
+            names[i], names[j] = names[j], names[i]
+        return state._replace(
+            rotor_names=tuple(names),
+            ring_settings=tuple(ring_settings),
+            positions=tuple(positions),
+        )
+
+    return state._replace(
+        ring_settings=tuple(ring_settings), positions=tuple(positions)
+    )
+
+
+# Islands report their best state and iterations done this often, and stop when the
+# report says so.
+REPORT_STRIDE = 64
+
+_CONTEXT: dict[str, Any] = {}
+
+
+def _init(
+    ciphertext: np.ndarray,
+    scorer: NgramScorer,
+    settings: dict[str, Any],
+    reports: Any = None,
+    stop: Any = None,
+) -> None:
+    _CONTEXT.update(ciphertext=ciphertext, scorer=scorer, **settings)
+    if reports is not None:
+        _CONTEXT.update(report=_report_to_queue, reports=reports, stop=stop)
+
+
+def _report_to_queue(score: float, state: State, n: int) -> bool:
+    _CONTEXT["reports"].put((score, state, n))
+    return not _CONTEXT["stop"].is_set()
+
+
+def _anneal_island(
+    state: State, seed: int, start: int, stop: int, deadline: float
+) -> tuple[State, float, State, float]:
+    try:
+        return _anneal(state, seed, start, stop, deadline)
+    finally:
+        # Tells the parent this island's reports are complete.
+        _CONTEXT["reports"].put(None)
+
+
+def _anneal(
+    state: State, seed: int, start: int, stop: int, deadline: float
+) -> tuple[State, float, State, float]:
+    ciphertext: np.ndarray = _CONTEXT["ciphertext"]
+    scorer: NgramScorer = _CONTEXT["scorer"]
+    reflector_type: str = _CONTEXT["reflector_type"]
+    rotor_names: Sequence[str] = _CONTEXT["rotor_names"]
+    schedule: Schedule = _CONTEXT["schedule"]
+    total: int = _CONTEXT["total_iterations"]
+    plugs: int = _CONTEXT["plugs"]
+    report: Callable[[float, State, int], bool] | None = _CONTEXT.get("report")
+
+    rng = np.random.default_rng(seed)
+    scrambler = scramblers(state, reflector_type, len(ciphertext))
+    score = scorer(decrypt(scrambler, state.plugboard, ciphertext))
+    best_state, best_score = state, score
+
+    reported = start
+    for iteration in range(start, stop):
+        if iteration % REPORT_STRIDE == 0 and iteration > reported:
+            keep_going = report is None or report(
+                best_score, best_state, iteration - reported
+            )
+            reported = iteration
+            if not keep_going or time.monotonic() > deadline:
+                stop = iteration
+                break
+
+        if rng.random() < _CONTEXT["plugboard_move_rate"]:
+            candidate = state._replace(
+                plugboard=move_plugboard(rng, state.plugboard, plugs)
+            )
+            candidate_scrambler = scrambler
+        else:
+            candidate = move_rotors(rng, state, rotor_names)
+            candidate_scrambler = scramblers(candidate, reflector_type, len(ciphertext))
+
+        candidate_score = scorer(
+            decrypt(candidate_scrambler, candidate.plugboard, ciphertext)
+        )
+        temperature = schedule.temperature(iteration / total)
+        delta = candidate_score - score
+        if delta >= 0 or rng.random() < math.exp(delta / temperature):
+            state, score, scrambler = candidate, candidate_score, candidate_scrambler
+            if score > best_score:
+                best_state, best_score = state, score
+
+    if report is not None and stop > reported:
+        report(best_score, best_state, stop - reported)
+    return state, score, best_state, best_score
+
+
+def _collect_reports(
+    driver: SearchDriver[State], futures: list[Future[Any]], reports: Any, stop: Any
+) -> None:
+    # Feeds the islands' reports to the driver until every island has finished, and
+    # tells them to stop once the driver does.
+    finished = 0
+    while finished < len(futures):
+        try:
+            message = reports.get(timeout=0.1)
+        except queue.Empty:
+            for future in futures:
+                if future.done() and future.exception() is not None:
+                    future.result()
+            continue
+
+        if message is None:
+            finished += 1
+        elif not driver.record(*message):
+            stop.set()
+
+
+def solve(
+    ciphertext: str,
+    scorer: NgramScorer,
+    reflector_type: str = "B",
+    rotor_names: Sequence[str] | None = None,
+    plugs: int = 10,
+    islands: int = 1,
+    epochs: int = 20,
+    iterations: int = 2000,
+    schedule: Schedule = Schedule(),
+    time_budget: float | None = None,
+    plugboard_move_rate: float = 0.7,
+    threshold: float | None = None,
+    progress: Callable[[ProgressReport], None] | None = None,
+    seed: int = 0,
+) -> SolverResult:
+    rotor_names = list(rotor_names or REGISTRY.rotors)
+    ints = text_to_ints(ciphertext)
+    settings = {
+        "reflector_type": reflector_type,
+        "rotor_names": rotor_names,
+        "schedule": schedule,
+        "total_iterations": epochs * iterations,
+        "plugs": plugs,
+        "plugboard_move_rate": plugboard_move_rate,
+    }
+    driver: SearchDriver[State] = SearchDriver(
+        keep=1,
+        total=epochs * iterations * islands,
+        time_budget=time_budget,
+        threshold=threshold,
+        progress=progress,
+    )
+
+    seeds = np.random.SeedSequence(seed)
+    rng = np.random.default_rng(seeds.spawn(1)[0])
+    states = [random_state(rng, rotor_names, plugs) for _ in range(islands)]
+
+    executor = None
+    if islands > 1:
+        reports: Any = multiprocessing.Queue()
+        stop = multiprocessing.Event()
+        executor = ProcessPoolExecutor(
+            islands,
+            initializer=_init,
+            initargs=(ints, scorer, settings, reports, stop),
+        )
+    _init(ints, scorer, settings)
+    _CONTEXT["report"] = driver.record
+
+    try:
+        with driver:
+            for epoch in range(epochs):
+                args = [
+                    (
+                        state,
+                        int(s.generate_state(1)[0]),
+                        epoch * iterations,
+                        (epoch + 1) * iterations,
+                        driver.deadline,
+                    )
+                    for state, s in zip(states, seeds.spawn(islands))
+                ]
+                if executor is None:
+                    results = [_anneal(*a) for a in args]
+                else:
+                    futures = [executor.submit(_anneal_island, *a) for a in args]
+                    _collect_reports(driver, futures, reports, stop)
+                    results = [f.result() for f in futures]
+
+                # Migration: the weakest island restarts from the best state so far.
+                states = [state for state, _, _, _ in results]
+                scores = [score for _, score, _, _ in results]
+                if islands > 1:
+                    states[int(np.argmin(scores))] = driver.top.results()[0][1]
+
+                if driver.stopped:
+                    break
+    finally:
+        _CONTEXT.pop("report", None)
+        if executor is not None:
+            executor.shutdown()
+
+    best = driver.top.best()
+    if best is None:
+        # Interrupted before the first epoch finished.
+        _, score, state, _ = _anneal(states[0], 0, 0, 0, driver.deadline)
+    else:
+        score, state = best
+    plaintext = decrypt(
+        scramblers(state, reflector_type, len(ints)), state.plugboard, ints
+    )
+
+    return SolverResult(
+        EnigmaKey(
+            rotor_names=list(state.rotor_names),
+            ring_settings=list(state.ring_settings),
+            reflector_type=reflector_type,
+            plugboard_connections=state.plugboard_connections,
+        ),
+        "".join(int_to_char(i) for i in state.positions),
+        score,
+        "".join(int_to_char(int(i)) for i in plaintext),
+    )
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable
+from typing import Iterator
+from typing import NamedTuple
+from typing import Sequence
+
+import numpy as np
+
+ENGLISH_FREQUENCIES = np.array(
+    (
+        "8.167 1.492 2.782 4.253 12.702 2.228 2.015 6.094 6.966 0.153 0.772 4.025 2.406 "
+        "6.749 7.507 1.929 0.095 5.987 6.327 9.056 2.758 0.978 2.360 0.150 1.974 0.074"
+    ).split(),
+    dtype=np.float64,
+)
+ENGLISH_FREQUENCIES /= ENGLISH_FREQUENCIES.sum()
+
+GERMAN_FREQUENCIES = np.array(
+    (
+        "6.516 1.886 2.732 5.076 16.396 1.656 3.009 4.577 6.550 0.268 1.417 3.437 2.534 "
+        "9.776 2.594 0.670 0.018 7.003 7.270 6.154 4.166 0.846 1.921 0.034 0.039 1.134"
+    ).split(),
+    dtype=np.float64,
+)
+GERMAN_FREQUENCIES /= GERMAN_FREQUENCIES.sum()
+
+CHUNK_SIZE = 10000
+
+
+def text_to_ints(text: str | bytes) -> np.ndarray:
+    if isinstance(text, str):
+        text = text.encode("ascii", "ignore")
+
+    # Same convention as utils.char_to_int: fold to one case, A/a -> 0, drop the rest.
+    ints = (np.frombuffer(text, dtype=np.uint8) | 0x20) - np.uint8(ord("a"))
+    return ints[ints < 26]
+
+
+def letter_counts(messages: Sequence[str | bytes]) -> np.ndarray:
+    if len(messages) == 0:
+        return np.zeros((0, 26), dtype=np.int64)
+
+    arrays = [text_to_ints(m) for m in messages]
+    lengths = np.array([len(a) for a in arrays])
+    message_ids = np.repeat(np.arange(len(arrays)), lengths)
+    flat = np.concatenate(arrays).astype(np.int64)
+    counts = np.bincount(message_ids * 26 + flat, minlength=len(arrays) * 26)
+
+    return counts.reshape(-1, 26)
+
+
+def index_of_coincidence(counts: np.ndarray) -> np.ndarray:
+    counts = np.asarray(counts, dtype=np.float64)
+    n = counts.sum(axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (counts * (counts - 1)).sum(axis=-1) / (n * (n - 1))
+
+
+def chi_squared(
+    counts: np.ndarray, profile: np.ndarray = ENGLISH_FREQUENCIES
+) -> np.ndarray:
+    counts = np.asarray(counts, dtype=np.float64)
+    expected = counts.sum(axis=-1, keepdims=True) * profile
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return ((counts - expected) ** 2 / expected).sum(axis=-1)
+
+
+class CorpusStats(NamedTuple):
+    names: np.ndarray
+    counts: np.ndarray
+    lengths: np.ndarray
+    index_of_coincidence: np.ndarray
+    chi_squared: np.ndarray
+
+    @classmethod
+    def from_counts(
+        cls,
+        names: Sequence[str],
+        counts: np.ndarray,
+        profile: np.ndarray = ENGLISH_FREQUENCIES,
+    ) -> CorpusStats:
+        return cls(
+            np.asarray(names, dtype=str),
+            counts,
+            counts.sum(axis=1),
+            index_of_coincidence(counts),
+            chi_squared(counts, profile),
+        )
+
+    @property
+    def total_counts(self) -> np.ndarray:
+        return self.counts.sum(axis=0)
+
+    def aggregate(self, profile: np.ndarray = ENGLISH_FREQUENCIES) -> dict[str, float]:
+        total = self.total_counts
+        return {
+            "messages": len(self.names),
+            "letters": int(total.sum()),
+            "index_of_coincidence": float(index_of_coincidence(total)),
+            "chi_squared": float(chi_squared(total, profile)),
+        }
+
+    def save(self, path: str) -> None:
+        np.savez_compressed(path, **self._asdict())
+
+    @classmethod
+    def load(cls, path: str) -> CorpusStats:
+        with np.load(path) as data:
+            return cls(**{k: data[k] for k in cls._fields})
+
+
+def iter_messages(path: str, field: str = "text") -> Iterator[tuple[str, str]]:
+    if path.endswith(".jsonl"):
+        with open(path, "r") as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+
+                record = json.loads(line)
+                if isinstance(record, str):
+                    yield f"{path}:{line_number}", record
+                else:
+                    name = record.get("id", f"{path}:{line_number}")
+                    yield str(name), record[field]
+    else:
+        with open(path, "r") as f:
+            yield path, f.read()
+
+
+def _file_counts(path: str, field: str) -> tuple[list[str], np.ndarray]:
+    names: list[str] = []
+    blocks: list[np.ndarray] = []
+    chunk: list[str] = []
+
+    for name, text in iter_messages(path, field):
+        names.append(name)
+        chunk.append(text)
+        if len(chunk) == CHUNK_SIZE:
+            blocks.append(letter_counts(chunk))
+            chunk = []
+
+    blocks.append(letter_counts(chunk))
+    return names, np.concatenate(blocks)
+
+
+def expand_paths(paths: Iterable[str]) -> list[str]:
+    files: list[str] = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, filenames in sorted(os.walk(path)):
+                files.extend(os.path.join(root, f) for f in sorted(filenames))
+        else:
+            files.append(path)
+
+    return files
+
+
+def corpus_stats(
+    paths: str | Iterable[str],
+    profile: np.ndarray = ENGLISH_FREQUENCIES,
+    field: str = "text",
+    workers: int | None = None,
+) -> CorpusStats:
+    files = expand_paths([paths] if isinstance(paths, str) else paths)
+
+    if workers == 1 or len(files) <= 1:
+        results = [_file_counts(f, field) for f in files]
+    else:
+        with ProcessPoolExecutor(workers) as executor:
+            results = list(executor.map(_file_counts, files, [field] * len(files)))
+
+    names = [name for file_names, _ in results for name in file_names]
+    counts = (
+        np.concatenate([c for _, c in results])
+        if results
+        else np.zeros((0, 26), dtype=np.int64)
+    )
+
+    return CorpusStats.from_counts(names, counts, profile)
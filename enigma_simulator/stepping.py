@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Any
+from typing import Sequence
+
+import numpy as np
+
+from enigma_simulator.keyspace import POSITIONS
+
+
+def position_index(positions: Sequence[int]) -> int:
+    left, middle, right = positions
+    return int(left) * 676 + int(middle) * 26 + int(right)
+
+
+class StepSchedule:
+    # Rotor positions at every keypress for one notch configuration, shared by every
+    # machine with the same middle and right notches. From any start the positions run
+    # into a cycle (16,900 keypresses for single notch rotors), and the next n
+    # keypresses are a wrapped slice of it.
+
+    def __init__(
+        self, middle_notches: Sequence[int], right_notches: Sequence[int]
+    ) -> None:
+        self.notches = (tuple(sorted(middle_notches)), tuple(sorted(right_notches)))
+
+        # rotors[:, index] is the (left, middle, right) of a position index.
+        self.rotors = np.array(
+            np.unravel_index(np.arange(POSITIONS), (26, 26, 26)), dtype=np.uint8
+        )
+        lefts, middles, rights = self.rotors.astype(np.intp)
+        middle_turns = np.isin(middles, self.notches[0])
+        right_turns = np.isin(rights, self.notches[1])
+        self.successors = np.ravel_multi_index(
+            (
+                (lefts + middle_turns) % 26,
+                (middles + (middle_turns | right_turns)) % 26,
+                (rights + 1) % 26,
+            ),
+            (26, 26, 26),
+        )
+
+        # Positions still reachable after more keypresses than there are positions
+        # are exactly those on a cycle.
+        reachable = self.successors
+        for _ in range(POSITIONS.bit_length()):
+            reachable = reachable[reachable]
+        self.on_cycle = np.zeros(POSITIONS, dtype=bool)
+        self.on_cycle[reachable] = True
+
+        # Every cycle laid out end to end in stepping order. A position on a cycle
+        # sits at order[offsets[i]], in the cycle order[starts[i]:starts[i] +
+        # lengths[i]].
+        successors = self.successors.tolist()
+        order: list[int] = []
+        self.offsets = np.zeros(POSITIONS, dtype=np.intp)
+        self.starts = np.zeros(POSITIONS, dtype=np.intp)
+        self.lengths = np.zeros(POSITIONS, dtype=np.intp)
+        visited = ~self.on_cycle
+        for position in np.flatnonzero(self.on_cycle).tolist():
+            if visited[position]:
+                continue
+            start = len(order)
+            while not visited[position]:
+                visited[position] = True
+                order.append(position)
+                position = successors[position]
+            cycle = np.array(order[start:], dtype=np.intp)
+            self.offsets[cycle] = np.arange(start, len(order))
+            self.starts[cycle] = start
+            self.lengths[cycle] = len(cycle)
+        self.order = np.array(order, dtype=np.intp)
+
+        for array in (
+            self.rotors,
+            self.successors,
+            self.on_cycle,
+            self.offsets,
+            self.starts,
+            self.lengths,
+            self.order,
+        ):
+            array.flags.writeable = False
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        # Workers rebuild the schedule from its notches, once per process.
+        return step_schedule, self.notches
+
+    def period(self, start: int) -> int:
+        # Keypresses after which the positions from start repeat.
+        while not self.on_cycle[start]:
+            start = int(self.successors[start])
+        return int(self.lengths[start])
+
+    def indices(self, start: int, n: int) -> np.ndarray:
+        # Position indices of the next n keypresses from the position index start.
+        head: list[int] = []
+        position = int(self.successors[start])
+        while not self.on_cycle[position] and len(head) < n:
+            head.append(position)
+            position = int(self.successors[position])
+        if len(head) == n:
+            return np.array(head, dtype=np.intp)
+
+        cycle_start = self.starts[position]
+        cycle = self.order[cycle_start : cycle_start + self.lengths[position]]
+        offset = self.offsets[position] - cycle_start
+        tail = np.take(cycle, np.arange(offset, offset + n - len(head)), mode="wrap")
+        return np.concatenate([np.array(head, dtype=np.intp), tail]) if head else tail
+
+    def positions(
+        self, start: Sequence[int], n: int
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        lefts, middles, rights = self.rotors[:, self.indices(position_index(start), n)]
+        return lefts, middles, rights
+
+
+@lru_cache(maxsize=64)
+def _step_schedule(
+    middle_notches: tuple[int, ...], right_notches: tuple[int, ...]
+) -> StepSchedule:
+    return StepSchedule(middle_notches, right_notches)
+
+
+def step_schedule(
+    middle_notches: Sequence[int], right_notches: Sequence[int]
+) -> StepSchedule:
+    return _step_schedule(
+        tuple(sorted(int(i) for i in middle_notches)),
+        tuple(sorted(int(i) for i in right_notches)),
+    )
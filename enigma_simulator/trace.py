@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import csv
+
+import numpy as np
+
+from enigma_simulator.utils import int_to_char
+
+ROTORS = ("left", "middle", "right")
+# Letter index after each stage of a keypress, in the order the signal goes through.
+STAGES = (
+    "input",
+    "plugboard",
+    "right",
+    "middle",
+    "left",
+    "reflector",
+    "left_back",
+    "middle_back",
+    "right_back",
+    "output",
+)
+
+
+class Trace:
+    # Rotor positions and per-stage letters of every traced keypress, kept in
+    # preallocated uint8 arrays that double in size when full.
+
+    def __init__(self, capacity: int = 1024) -> None:
+        self._positions = np.zeros((capacity, len(ROTORS)), dtype=np.uint8)
+        self._letters = np.zeros((capacity, len(STAGES)), dtype=np.uint8)
+        self._length = 0
+
+    def __len__(self) -> int:
+        return self._length
+
+    @property
+    def positions(self) -> np.ndarray:
+        return self._positions[: self._length]
+
+    @property
+    def letters(self) -> np.ndarray:
+        return self._letters[: self._length]
+
+    def allocate(self, n: int) -> tuple[np.ndarray, np.ndarray]:
+        # Views of the next n rows, to be filled in by the caller.
+        if self._length + n > len(self._positions):
+            capacity = max(2 * len(self._positions), self._length + n)
+            self._positions = np.resize(self._positions, (capacity, len(ROTORS)))
+            self._letters = np.resize(self._letters, (capacity, len(STAGES)))
+
+        rows = slice(self._length, self._length + n)
+        self._length += n
+        return self._positions[rows], self._letters[rows]
+
+    def clear(self) -> None:
+        self._length = 0
+
+    def to_array(self) -> np.ndarray:
+        # One row per keypress: the three rotor positions then every stage.
+        return np.hstack([self.positions, self.letters])
+
+    def save(self, file_path: str) -> None:
+        if file_path[-4:] == ".npy":
+            np.save(file_path, self.to_array())
+        elif file_path[-4:] == ".csv":
+            with open(file_path, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(ROTORS + STAGES)
+                for row in self.to_array().tolist():
+                    writer.writerow([int_to_char(i) for i in row])
+        else:
+            raise NotImplementedError
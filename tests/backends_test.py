@@ -0,0 +1,79 @@
+import pytest
+
+from enigma_simulator import backends
+from enigma_simulator.benchmark import calibrate
+from enigma_simulator.enigma import Enigma
+from enigma_simulator.engine import ProcessEnigma
+
+MESSAGE = (
+    "Tomorrow and tomorrow and tomorrow Creeps in this petty pace from day to day "
+    "To the last syllable of recorded time And all our yesterdays have lighted fools"
+)
+
+
+@pytest.fixture
+def thresholds(monkeypatch):
+    monkeypatch.setitem(backends.THRESHOLDS, "vectorized", 100)
+    monkeypatch.setitem(backends.THRESHOLDS, "process", 10000)
+    monkeypatch.setattr(ProcessEnigma, "workers", 2)
+
+
+@pytest.mark.parametrize(
+    ("length", "batch_size", "expected"),
+    (
+        (1, 1, "table"),
+        (99, 1, "table"),
+        (100, 1, "vectorized"),
+        (10000, 1, "process"),
+        (50, 200, "process"),
+    ),
+)
+def test_select_backend(thresholds, length, batch_size, expected):
+    assert backends.select_backend(length, batch_size) == expected
+
+
+def test_select_backend_single_core(thresholds, monkeypatch):
+    monkeypatch.setattr(ProcessEnigma, "workers", 1)
+
+    assert backends.select_backend(10 ** 6) == "vectorized"
+
+
+@pytest.mark.parametrize("backend", backends.BACKENDS)
+def test_backends_match_matrix_reference(thresholds, monkeypatch, backend):
+    monkeypatch.setattr(ProcessEnigma, "segment_size", 16)
+    reference = Enigma(
+        ["VI", "II", "VIII"], [1, 2, 3], "B", "AB CD", [0, 12, 24], "matrix"
+    )
+    enigma = Enigma(["VI", "II", "VIII"], [1, 2, 3], "B", "AB CD", [0, 12, 24], backend)
+
+    for message in (MESSAGE, MESSAGE[:10], MESSAGE * 3, "HELLO, WORLD 42"):
+        assert enigma.encrypt(message) == reference.encrypt(message)
+    assert enigma.encrypt_transmission(MESSAGE, "QEV", "ABC") == (
+        reference.encrypt_transmission(MESSAGE, "QEV", "ABC")
+    )
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        Enigma(["I", "II", "III"], [1, 1, 1], "B", "", [0, 0, 0], "gpu")
+    with pytest.raises(ValueError):
+        backends.compile_enigma(
+            Enigma(["I", "II", "III"], [1, 1, 1], "B", "", [0, 0, 0]), "matrix"
+        )
+
+
+def test_load_thresholds(tmpdir, monkeypatch):
+    monkeypatch.setattr(backends, "THRESHOLDS", dict(backends.DEFAULT_THRESHOLDS))
+    p = tmpdir / "thresholds.json"
+    p.write_text('{"vectorized": 7}', encoding=None)
+    backends.load_thresholds(str(p))
+
+    assert backends.THRESHOLDS["vectorized"] == 7
+    assert backends.THRESHOLDS["process"] == backends.DEFAULT_THRESHOLDS["process"]
+
+
+def test_calibrate():
+    thresholds, timings = calibrate(lengths=(1, 16, 256))
+
+    assert set(thresholds) == {"vectorized", "process"}
+    assert all(len(t) == 3 for t in timings.values())
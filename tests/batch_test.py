@@ -0,0 +1,113 @@
+import io
+import json
+
+import pytest
+
+from enigma_simulator import batch
+from enigma_simulator.enigma import Enigma
+
+KEY = {
+    "rotor_names": ["I", "II", "III"],
+    "ring_settings": [1, 1, 1],
+    "reflector_type": "B",
+}
+
+JOBS = [
+    {"id": 0, **KEY, "positions": "AAA", "text": "HELLOXWORLD"},
+    {
+        "id": 1,
+        **KEY,
+        "plugboard_connections": "AB FD CH LO PW",
+        "mode": "transmission",
+        "encrypt": False,
+        "positions": "WZA",
+        "message_key": "IGI",
+        "text": "EVIVKEGIPXXOQZ",
+    },
+    {
+        "id": 2,
+        **KEY,
+        "plugboard_connections": "AB FD CH LO PW",
+        "mode": "transmission",
+        "positions": "WZA",
+        "message_key": "SXT",
+        "text": "HELLOHOWAREYOU",
+    },
+    {"id": 3, **KEY, "rotor_names": ["I", "II", "XI"], "text": "A"},
+    {"id": 4, **KEY, "plugboard_connections": "AB BC", "text": "A"},
+    {"id": 5, **KEY, "mode": "other", "text": "A"},
+]
+
+
+def run(lines, **kwargs):
+    stream = io.BytesIO()
+    count = batch.run_batch(lines, stream, **kwargs)
+    results = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert count == len(results)
+    return results
+
+
+@pytest.mark.parametrize("workers", (1, 2))
+@pytest.mark.parametrize("window_size", (1, 4, 1024))
+@pytest.mark.parametrize("backend", ("auto", "table", "vectorized", "process"))
+def test_run_batch(workers, window_size, backend):
+    lines = [json.dumps(job) for job in JOBS] + ["", "not json"]
+    results = run(lines, workers=workers, window_size=window_size, backend=backend)
+
+    assert results[:3] == [
+        {"id": 0, "text": "LOFUHZZLZOM"},
+        {"id": 1, "text": "HELLOHOWAREYOU"},
+        {"id": 2, "positions": "WZA", "message_key": "IGI", "text": "EVIVKEGIPXXOQZ"},
+    ]
+    assert [r["id"] for r in results[3:6]] == [3, 4, 5]
+    assert all("error" in r for r in results[3:])
+    assert len(results) == len(JOBS) + 1
+
+
+@pytest.mark.parametrize(("workers", "pooled"), ((None, False), (1, False), (2, True)))
+def test_pool_use(monkeypatch, workers, pooled):
+    pools = []
+
+    class Pool(batch.ProcessPoolExecutor):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            pools.append(self)
+
+    monkeypatch.setattr(batch, "ProcessPoolExecutor", Pool)
+    results = run([json.dumps(JOBS[0])], workers=workers, backend="table")
+
+    assert results == [{"id": 0, "text": "LOFUHZZLZOM"}]
+    assert len(pools) == int(pooled)
+
+
+def test_results_keep_input_order_across_keys():
+    jobs = [
+        {**KEY, "ring_settings": [i % 3, 0, 0], "positions": [0, 0, i], "text": "A" * i}
+        for i in range(50)
+    ]
+    results = run(
+        [json.dumps(job) for job in jobs], workers=2, window_size=16, backend="process"
+    )
+
+    for job, result in zip(jobs, results):
+        enigma = Enigma(
+            ["I", "II", "III"], job["ring_settings"], "B", "", job["positions"]
+        )
+        assert result["text"] == enigma.encrypt(job["text"])
+
+
+def test_keys_are_validated_once():
+    keys = batch.KeyCache()
+    for _ in range(3):
+        keys.resolve({**KEY, "text": "A"})
+        keys.resolve({"key": KEY})
+
+    assert len(keys) == 1
+
+
+def test_key_file(tmpdir):
+    p = tmpdir / "key.json"
+    p.write_text(json.dumps(KEY), encoding=None)
+    (result,) = run([json.dumps({"key": str(p), "text": "HELLOXWORLD"})], workers=1)
+
+    assert result == {"text": "LOFUHZZLZOM"}
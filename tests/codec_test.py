@@ -0,0 +1,94 @@
+import codecs
+import io
+
+import pytest
+
+from enigma_simulator import codec
+from enigma_simulator.enigma import Enigma
+
+MESSAGE = "Tomorrow and tomorrow and tomorrow\nCreeps in this petty pace\n" * 30
+
+
+def reference():
+    return Enigma(["I", "VI", "III"], [1, 2, 3], "B", "AB HF", [0, 12, 21])
+
+
+@pytest.fixture
+def enigma_codec():
+    codec.register(reference())
+    yield "enigma"
+    codec.unregister()
+
+
+def expected(message):
+    enigma = reference()
+    return "\n".join(enigma.encrypt(line) for line in message.split("\n"))
+
+
+def test_encode_and_decode(enigma_codec):
+    encrypted = MESSAGE.encode(enigma_codec)
+
+    assert encrypted.decode() == expected(MESSAGE)
+    assert encrypted.decode(enigma_codec) == MESSAGE.upper()
+
+
+def test_punctuation_round_trip(enigma_codec):
+    message = "Meet at 10:30, gate 4."
+    encrypted = message.encode(enigma_codec)
+
+    assert encrypted.decode() == reference().encrypt(message)
+    assert encrypted.decode(enigma_codec) == message.upper()
+
+
+def test_unknown_codec():
+    with pytest.raises(LookupError):
+        "HELLO".encode("enigma-not-registered")
+
+
+def test_non_ascii_follows_errors(enigma_codec):
+    with pytest.raises(UnicodeEncodeError):
+        "café".encode(enigma_codec)
+
+    assert "café".encode(enigma_codec, "ignore") == "CAF".encode(enigma_codec)
+
+
+def test_incremental_encoder_keeps_state(enigma_codec):
+    encoder = codecs.getincrementalencoder(enigma_codec)()
+    chunks = [MESSAGE[i : i + 13] for i in range(0, len(MESSAGE), 13)]
+
+    assert b"".join(encoder.encode(c) for c in chunks).decode() == expected(MESSAGE)
+
+    encoder.reset()
+    assert encoder.encode(MESSAGE).decode() == expected(MESSAGE)
+
+
+def test_text_io_round_trip(tmpdir, enigma_codec):
+    path = str(tmpdir / "message.txt")
+    with open(path, "w", encoding=enigma_codec) as f:
+        for line in MESSAGE.splitlines(keepends=True):
+            f.write(line)
+
+    with open(path, "rb") as f:
+        assert f.read().decode() == expected(MESSAGE)
+
+    with open(path, encoding=enigma_codec) as f:
+        start = f.read(100)
+        position = f.tell()
+        rest = f.read()
+        f.seek(position)
+        assert f.read() == rest
+
+    assert start + rest == MESSAGE.upper()
+
+
+def test_stream_reader_and_writer(enigma_codec):
+    stream = io.BytesIO()
+    writer = codecs.getwriter(enigma_codec)(stream)
+    writer.write(MESSAGE[:50])
+    writer.write(MESSAGE[50:])
+
+    assert stream.getvalue().decode() == expected(MESSAGE)
+
+    stream.seek(0)
+    reader = codecs.getreader(enigma_codec)(stream)
+    assert reader.read() == MESSAGE.upper()
@@ -0,0 +1,36 @@
+from enigma_simulator import difftest
+from enigma_simulator.engine import CompiledEnigma
+
+
+def test_run_finds_no_failures():
+    (report,) = difftest.run(["vectorized"], cases=50, seed=1)
+
+    assert report.failures == []
+    assert report.characters > 0
+    assert report.engine_rate > 0
+
+
+class NoDoubleStep(CompiledEnigma):
+    def step(self, n):
+        lefts, middles, rights = super().step(n)
+        return lefts * 0, middles, rights
+
+
+def test_shrinks_failures_to_minimal_reproducer():
+    case = difftest.Case(
+        ("I", "II", "III"), (4, 5, 6), "B", "AB CD EF", (0, 3, 20), "HELLO WORLD" * 10
+    )
+    engine = NoDoubleStep.from_enigma
+    shrunk = difftest.shrink(engine, case)
+
+    assert difftest.first_mismatch(engine, shrunk) == len(shrunk.message) - 1
+    assert len(shrunk.message) < len(case.message)
+    assert shrunk.plugboard_connections == ""
+    assert " " not in shrunk.message
+
+
+def test_main_reports_failures(monkeypatch):
+    monkeypatch.setitem(difftest.ENGINES, "broken", NoDoubleStep.from_enigma)
+
+    assert difftest.main(["-e", "vectorized", "-n", "5"]) == 0
+    assert difftest.main(["-e", "broken", "-n", "50", "--max-failures", "1"]) == 1
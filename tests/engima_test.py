@@ -25,6 +25,12 @@ def test_encryption(message, expected):
     assert encrypted == expected
 
 
+def test_matrix_passes_non_letters_through():
+    enigma = Enigma(["I", "II", "III"], [1, 1, 1], "B", "", [0, 0, 0], "matrix")
+
+    assert enigma.encrypt("A, A.\n3éA") == "E, W.\n3éT"
+
+
 def test_turnover_and_double_stepping():
     enigma = Enigma(["I", "II", "III"], [1, 1, 1], "B", "", ["Z", "Z", "Z"])
     message = (
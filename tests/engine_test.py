@@ -0,0 +1,143 @@
+import numpy as np
+import pytest
+
+from enigma_simulator.engine import CompiledEnigma
+from enigma_simulator.engine import scrambler_core
+from enigma_simulator.engine import TableEnigma
+from enigma_simulator.enigma import create_enigma_from_key
+from enigma_simulator.enigma import Enigma
+from enigma_simulator.key import EnigmaKey
+from enigma_simulator.registry import REGISTRY
+
+
+@pytest.mark.parametrize(
+    ("message", "expected"),
+    (
+        pytest.param("AAAAA", "EWTYX", id="simple message"),
+        pytest.param("HELLOXWORLD", "LOFUHZZLZOM", id="hello world"),
+        pytest.param("", "", id="handles empty string"),
+        pytest.param("toxcaps", "PESEXKY", id="handles lower case"),
+        pytest.param("A, A.", "E, W.", id="passes non-letters through"),
+    ),
+)
+def test_encryption(message, expected):
+    enigma = Enigma(["I", "II", "III"], [1, 1, 1], "B", "", ["A", "A", "A"])
+    compiled = CompiledEnigma.from_enigma(enigma)
+
+    assert compiled.encrypt(message) == expected
+
+
+@pytest.mark.parametrize("rotor_names", (["I", "II", "III"], ["VI", "VII", "VIII"]))
+def test_stepping_matches_reference(rotor_names):
+    enigma = Enigma(rotor_names, [3, 7, 11], "C", "AB CD EF", ["Z", "Z", "Z"])
+    compiled = CompiledEnigma.from_enigma(enigma)
+
+    lefts, middles, rights = compiled.step(2000)
+    for left, middle, right in zip(lefts, middles, rights):
+        enigma.rotate()
+        assert [left, middle, right] == [
+            enigma.left_rotor.position,
+            enigma.middle_rotor.position,
+            enigma.right_rotor.position,
+        ]
+    assert compiled.positions == [lefts[-1], middles[-1], rights[-1]]
+
+
+def test_state_carries_between_calls():
+    message = "THEQUICKBROWNFOXJUMPSOVERTHELAZYDOG" * 20
+    enigma = Enigma(["II", "V", "VI"], [0, 5, 9], "B", "QW ER", [4, 11, 2])
+    compiled = CompiledEnigma.from_enigma(enigma)
+    expected = enigma.encrypt(message)
+
+    assert "".join(
+        compiled.encrypt(message[i : i + 37]) for i in range(0, 700, 37)
+    ) == (expected)
+
+
+def test_encrypt_bytes_in_place():
+    enigma = Enigma(["I", "II", "III"], [1, 1, 1], "B", "", [0, 0, 0])
+    compiled = CompiledEnigma.from_enigma(enigma)
+    data = np.frombuffer(b"HELLO\nXWORLD", dtype=np.uint8).copy()
+    compiled.encrypt_bytes(data, out=data)
+
+    assert data.tobytes() == b"LOFUH\nZZLZOM"
+
+
+def test_from_key_matches_from_enigma():
+    key = EnigmaKey(
+        rotor_names=["VIII", "IV", "VI"],
+        ring_settings=[5, 30, 25],
+        reflector_type="C",
+        plugboard_connections="AZ BY CX",
+    )
+    message = "THEQUICKBROWNFOXJUMPSOVERTHELAZYDOG" * 30
+
+    compiled = CompiledEnigma.from_key(key, "QEV")
+    expected = create_enigma_from_key(key, list("QEV")).encrypt(message)
+
+    assert compiled.encrypt(message) == expected
+
+
+def test_scramblers_match_encrypt_ints():
+    compiled = CompiledEnigma.from_settings(["VI", "II", "VIII"], [4, 5, 6], "C", "")
+    scrambler_machine = CompiledEnigma.from_settings(
+        ["VI", "II", "VIII"], [4, 5, 6], "C", ""
+    )
+    ints = np.random.default_rng(0).integers(0, 26, size=1000).astype(np.uint8)
+
+    scramblers = scrambler_machine.scramblers(len(ints))
+
+    assert scramblers.shape == (1000, 26)
+    assert (scramblers[np.arange(1000), ints] == compiled.encrypt_ints(ints)).all()
+    assert scrambler_machine.positions == compiled.positions
+
+
+def test_plugboard_change_reuses_scrambler_core():
+    settings = (["II", "V", "VII"], [3, 29, 11], "C")
+    machine = CompiledEnigma.from_settings(*settings, "AB CD", "QEV")
+    composite = machine.composite_tables()
+
+    other = CompiledEnigma.from_settings(*settings, "XY", "QEV")
+
+    assert other.core is machine.core
+    assert other.composite_tables() is composite
+    assert other.with_plugboard("AB CD").encrypt("HELLOWORLD") == machine.encrypt(
+        "HELLOWORLD"
+    )
+
+    assert not machine.core.forward.flags.writeable
+    assert not composite.flags.writeable
+
+
+def test_from_enigma_shares_scrambler_core():
+    enigma = Enigma(["II", "V", "VII"], [3, 29, 11], "C", "AB CD", list("QEV"))
+    machine = CompiledEnigma.from_enigma(enigma)
+
+    assert machine.core is scrambler_core(["II", "V", "VII"], [3, 3, 11], "C")
+    assert machine.encrypt("HELLOWORLD") == enigma.encrypt_matrix("HELLOWORLD")
+
+
+def test_reregistered_rotor_gets_new_core(monkeypatch):
+    settings = (["I", "II", "III"], [0, 0, 0], "B")
+    machine = CompiledEnigma.from_settings(*settings)
+    wiring = REGISTRY.rotor("I")
+    monkeypatch.setitem(REGISTRY.rotors, "I", REGISTRY.rotor("II"))
+    monkeypatch.setattr(REGISTRY, "version", REGISTRY.version + 1)
+
+    other = CompiledEnigma.from_settings(*settings)
+
+    assert other.core is not machine.core
+    assert (other.forward[0] == REGISTRY.rotor("II").tables(0)[0]).all()
+    assert (machine.forward[0] == wiring.tables(0)[0]).all()
+
+
+def test_set_plugboard():
+    settings = (["I", "II", "III"], [1, 1, 1], "B")
+    expected = TableEnigma.from_settings(*settings, "AB CD").encrypt("HELLOWORLD")
+    machine = TableEnigma.from_settings(*settings)
+    machine.encrypt("HELLO")
+
+    machine.set_plugboard("AB CD")
+    machine.update_rotor_positions("AAA")
+
+    assert machine.encrypt("HELLOWORLD") == expected
@@ -0,0 +1,32 @@
+import pytest
+
+from enigma_simulator.engine import CompiledEnigma
+from enigma_simulator.enigma import Enigma
+from enigma_simulator.files import encrypt_file
+
+
+@pytest.mark.parametrize("window_size", (1, 7, 1 << 20))
+def test_encrypt_file_round_trip(tmpdir, window_size):
+    message = b"Attack at dawn. Bring 3 rotors!\r\n\xc3\xa9" * 40
+    plain, cipher, decrypted = tmpdir / "plain", tmpdir / "cipher", tmpdir / "decrypted"
+    plain.write_binary(message)
+
+    def engine():
+        enigma = Enigma(["IV", "VII", "II"], [4, 2, 0], "C", "QZ MX", [25, 12, 11])
+        return CompiledEnigma.from_enigma(enigma)
+
+    assert encrypt_file(engine(), str(plain), str(cipher), window_size) == len(message)
+    encrypt_file(engine(), str(cipher), str(decrypted), window_size)
+
+    assert cipher.read_binary() != message
+    assert decrypted.read_binary() == message.upper()
+
+
+def test_encrypt_file_rejects_same_file(tmpdir):
+    path = tmpdir / "plain"
+    path.write_binary(b"HELLO")
+    enigma = Enigma(["I", "II", "III"], [0, 0, 0], "B", "", [0, 0, 0])
+
+    with pytest.raises(ValueError):
+        encrypt_file(CompiledEnigma.from_enigma(enigma), str(path), str(path))
+    assert path.read_binary() == b"HELLO"
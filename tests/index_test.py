@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+
+from enigma_simulator.engine import CompiledEnigma
+from enigma_simulator.index import build_indexes
+from enigma_simulator.index import cycle_lengths
+from enigma_simulator.index import InvariantIndex
+from enigma_simulator.index import lookup
+from enigma_simulator.index import partition_ids
+from enigma_simulator.index import signature
+
+WHEEL_ORDER = ("I", "II", "III")
+
+
+@pytest.fixture(scope="module")
+def index():
+    return InvariantIndex.build(WHEEL_ORDER)
+
+
+def permutations(plugboard_connections, ring_settings=(0, 0, 0), positions="CDF"):
+    machine = CompiledEnigma.from_settings(
+        WHEEL_ORDER, ring_settings, "B", plugboard_connections, positions
+    )
+    plugboard = machine.plugboard
+    return [plugboard[s[plugboard]] for s in machine.scramblers(6)]
+
+
+def test_partition_ids():
+    ids = partition_ids()
+
+    assert len(ids) == 2436
+    assert ids[(26,)] == 0
+    assert ids[(1,) * 26] == len(ids) - 1
+
+
+def test_cycle_lengths():
+    permutation = np.array([[1, 2, 0, 4, 3] + list(range(5, 26))])
+
+    assert cycle_lengths(permutation)[0, :6].tolist() == [3, 3, 3, 2, 2, 1]
+
+
+def test_signature_is_plugboard_invariant():
+    assert signature(permutations("")) == signature(permutations("AQ BT EZ KM"))
+
+
+@pytest.mark.parametrize(
+    ("ring_settings", "positions"),
+    (
+        pytest.param((0, 0, 0), "CDF", id="no ring settings"),
+        pytest.param((0, 0, 2), "CDH", id="right ring setting"),
+    ),
+)
+def test_lookup_finds_wiring_offsets(index, ring_settings, positions):
+    candidates = index.lookup_permutations(
+        permutations("AQ BT EZ KM", ring_settings, positions)
+    )
+
+    assert "CDF" in candidates
+    assert len(candidates) < 100
+
+
+def test_index_is_sorted(index):
+    assert len(index) == 26 ** 3
+    assert (index.signatures[1:] >= index.signatures[:-1]).all()
+    assert sorted(index.positions.tolist()) == list(range(26 ** 3))
+
+
+def test_save_and_load(tmp_path, index):
+    path = str(tmp_path / "index.npz")
+    index.save(path)
+    loaded = InvariantIndex.load(path)
+
+    assert loaded.rotor_names == index.rotor_names
+    assert loaded.reflector_type == "B"
+    assert loaded.pairs == index.pairs
+    assert (loaded.signatures == index.signatures).all()
+    assert (loaded.positions == index.positions).all()
+
+
+def test_build_indexes_and_lookup(tmp_path):
+    wheel_orders = [WHEEL_ORDER, ("III", "II", "I")]
+    paths = build_indexes(str(tmp_path), wheel_orders, pairs=[(0, 3)])
+
+    assert len(paths) == 2
+    assert (WHEEL_ORDER, "CDF") in lookup(
+        str(tmp_path), wheel_orders, permutations("AB")[:4]
+    )
+
+
+def test_too_many_pairs():
+    with pytest.raises(ValueError):
+        signature(permutations(""), [(0, 1)] * 6)
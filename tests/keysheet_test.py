@@ -0,0 +1,128 @@
+import datetime
+
+import pytest
+
+from enigma_simulator.engine import CompiledEnigma
+from enigma_simulator.keysheet import generate_key_sheet
+from enigma_simulator.keysheet import generate_key_sheets
+from enigma_simulator.keysheet import KeySheet
+
+RECORD = {
+    "date": "2024-05-01",
+    "rotor_names": ["I", "II", "III"],
+    "ring_settings": [1, 1, 1],
+    "reflector_type": "B",
+    "plugboard_connections": "AB CD",
+}
+
+
+def test_generate_key_sheet():
+    sheet = generate_key_sheet("2024-01-01", 2000, plugs=10, seed=0)
+
+    assert len(sheet) == 2000
+    assert str(sheet.dates[-1]) == "2029-06-22"
+    assert not (sheet.rotor_names[1:] == sheet.rotor_names[:-1]).all(axis=1).any()
+    assert all(len(set(names)) == 3 for names in sheet.rotor_names.tolist())
+    assert ((0 <= sheet.ring_settings) & (sheet.ring_settings < 26)).all()
+    assert all(len(c.split()) == 10 for c in sheet.plugboard_connections.tolist())
+    sheet.validate()
+
+
+def test_generate_key_sheet_is_reproducible():
+    a = generate_key_sheet("2024-01-01", 31, seed=42)
+    b = generate_key_sheet("2024-01-01", 31, seed=42)
+    c = generate_key_sheet("2024-01-01", 31, seed=43)
+
+    assert a.records() == b.records()
+    assert a.records() != c.records()
+
+
+def test_generate_key_sheets():
+    sheets = generate_key_sheets(["red", "blue"], "2024-01-01", 31, seed=0)
+
+    assert list(sheets) == ["red", "blue"]
+    assert sheets["red"].records() != sheets["blue"].records()
+
+
+@pytest.mark.parametrize("plugs", (-1, 14))
+def test_generate_key_sheet_invalid_plugs(plugs):
+    with pytest.raises(ValueError):
+        generate_key_sheet("2024-01-01", 31, plugs=plugs)
+
+
+def test_key_and_machine():
+    sheet = KeySheet.from_records([RECORD])
+
+    key = sheet.key(datetime.date(2024, 5, 1))
+    machine = sheet.machine("2024-05-01")
+    machine.update_rotor_positions("AAA")
+
+    assert key.plugboard_connections == "AB CD"
+    assert machine.encrypt("HELLO") == CompiledEnigma.from_key(key).encrypt("HELLO")
+    assert sheet.machine("2024-05-01") is not machine
+    with pytest.raises(KeyError):
+        sheet.key("2024-05-02")
+
+
+@pytest.mark.parametrize("extension", (".json", ".yaml", ".csv"))
+def test_save_and_load(tmp_path, extension):
+    sheet = generate_key_sheet("2024-01-01", 31, seed=0)
+    path = str(tmp_path / f"sheet{extension}")
+
+    sheet.save(path)
+
+    assert KeySheet.load(path).records() == sheet.records()
+
+
+def test_load_keys_field(tmp_path):
+    path = tmp_path / "sheet.yml"
+    path.write_text(
+        "network: red\nkeys:\n  - date: 2024-05-01\n    rotor_names: [I, II, III]\n"
+        "    ring_settings: [1, 1, 1]\n    reflector_type: B\n"
+    )
+
+    assert KeySheet.load(str(path)).records() == [
+        {**RECORD, "plugboard_connections": ""}
+    ]
+
+
+def test_load_unknown_extension(tmp_path):
+    path = tmp_path / "sheet.txt"
+    path.write_text("")
+
+    with pytest.raises(NotImplementedError):
+        KeySheet.load(str(path))
+
+
+def test_validation_reports_every_bad_row():
+    records = [
+        RECORD,
+        {**RECORD, "date": "2024-05-02", "rotor_names": ["I", "II", "X"]},
+        {**RECORD, "date": "2024-05-03", "plugboard_connections": "AB AC"},
+        {**RECORD, "date": "2024-05-04", "plugboard_connections": "ABC"},
+        {**RECORD, "date": "2024-05-05", "reflector_type": "Z"},
+        RECORD,
+    ]
+
+    with pytest.raises(RuntimeError) as excinfo:
+        KeySheet.from_records(records)
+
+    message = str(excinfo.value)
+    assert "2024-05-01: duplicated date" in message
+    assert "2024-05-02: unknown rotor" in message
+    assert "2024-05-03: duplicated plug" in message
+    assert "2024-05-04: invalid plugboard" in message
+    assert "2024-05-05: unknown reflector" in message
+
+
+@pytest.mark.parametrize(
+    "records",
+    (
+        pytest.param([], id="empty"),
+        pytest.param([{"date": "2024-05-01"}], id="missing field"),
+        pytest.param([{**RECORD, "ring_settings": [1, 1]}], id="wrong length"),
+    ),
+)
+def test_invalid_records(records):
+    with pytest.raises(RuntimeError):
+        KeySheet.from_records(records)
@@ -0,0 +1,112 @@
+import pytest
+
+from enigma_simulator.key import EnigmaKey
+from enigma_simulator.keyspace import KeySettings
+from enigma_simulator.keyspace import KeySpace
+from enigma_simulator.keyspace import POSITIONS
+from enigma_simulator.keyspace import search
+
+
+def test_keyspace_size():
+    assert len(KeySpace()) == 8 * 7 * 6 * 4 * POSITIONS ** 2
+    assert len(KeySpace(allow_repeated_rotors=True)) == 8 ** 3 * 4 * POSITIONS ** 2
+
+
+@pytest.mark.parametrize(
+    "index", (0, 1, 12345678901, 8 * 7 * 6 * 4 * POSITIONS ** 2 - 1)
+)
+def test_index_round_trip(index):
+    keyspace = KeySpace()
+    settings = keyspace.settings_at(index)
+
+    assert keyspace.index_of(settings) == index
+
+    key, positions = keyspace.key_at(index)
+    assert keyspace.index_of(key, positions) == index
+
+
+def test_index_of_key():
+    keyspace = KeySpace()
+    key = EnigmaKey(
+        rotor_names=["III", "I", "VIII"],
+        ring_settings=[1, 27, 25],
+        reflector_type="C",
+    )
+    index = keyspace.index_of(key, "AZQ")
+
+    assert keyspace.settings_at(index) == KeySettings(
+        ("III", "I", "VIII"), "C", (1, 1, 25), (0, 25, 16)
+    )
+
+
+def test_index_out_of_keyspace():
+    keyspace = KeySpace(rotor_names=["I", "II", "III"])
+
+    with pytest.raises(IndexError):
+        keyspace.settings_at(len(keyspace))
+    with pytest.raises(ValueError):
+        keyspace.index_of(KeySettings(("I", "II", "IV"), "B", (0, 0, 0), (0, 0, 0)))
+
+
+def test_shards_are_disjoint_and_complete():
+    keyspace = KeySpace(rotor_names=["I", "II", "III"], reflector_types=["B"])
+    shards = [keyspace.shard(i, 7) for i in range(7)]
+
+    assert shards[0].start == 0
+    assert shards[-1].stop == len(keyspace)
+    assert all(a.stop == b.start for a, b in zip(shards, shards[1:]))
+
+
+def _score(settings):
+    return float(sum(settings.positions))
+
+
+def test_search_resumes_from_checkpoint(tmpdir):
+    keyspace = KeySpace(rotor_names=["I", "II", "III"], reflector_types=["B"])
+    shard_count = len(keyspace) // 50
+    path = str(tmpdir / "checkpoint.json")
+    expected = search(keyspace, _score, 3, shard_count, keep=3)
+
+    calls = []
+
+    def interrupted_score(settings):
+        if len(calls) == 20:
+            raise KeyboardInterrupt
+        calls.append(settings)
+        return _score(settings)
+
+    partial = search(keyspace, interrupted_score, 3, shard_count, path, keep=3)
+    assert partial == sorted(((_score(s), s) for s in calls), key=lambda x: -x[0])[:3]
+
+    resumed = []
+
+    def resumed_score(settings):
+        resumed.append(settings)
+        return _score(settings)
+
+    assert search(keyspace, resumed_score, 3, shard_count, path, keep=3) == expected
+    assert len(calls) + len(resumed) == len(keyspace.shard(3, shard_count))
+    assert not set(calls) & set(resumed)
+
+
+def test_checkpoint_for_other_shard_is_rejected(tmpdir):
+    keyspace = KeySpace(rotor_names=["I", "II", "III"], reflector_types=["B"])
+    path = str(tmpdir / "checkpoint.json")
+    search(keyspace, _score, 0, len(keyspace) // 10, path)
+
+    with pytest.raises(RuntimeError):
+        search(keyspace, _score, 1, len(keyspace) // 10, path)
+
+
+def test_search_stops_at_threshold():
+    keyspace = KeySpace(rotor_names=["I", "II", "III"], reflector_types=["B"])
+    calls = []
+
+    def score(settings):
+        calls.append(settings)
+        return _score(settings)
+
+    results = search(keyspace, score, keep=1, threshold=40)
+
+    assert results[0][0] >= 40
+    assert len(calls) < len(keyspace)
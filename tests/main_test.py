@@ -4,6 +4,7 @@ from unittest import mock
 import pytest
 
 from enigma_simulator import main
+from enigma_simulator.enigma import Enigma
 
 
 def test_help_command():
@@ -52,6 +53,15 @@ def test_cli_encrypt_message(argparse_parse_args_spy):
     argparse_parse_args_spy.assert_has_calls([mock.call(args)])
 
 
+@pytest.mark.parametrize("backend", ("auto", "matrix", "table", "vectorized"))
+def test_cli_encrypt_message_backend(backend):
+    args = ["-n", "I", "II", "III", "-s", "1", "1", "1", "-r", "B", "-b", backend]
+    with mock.patch.object(main.output, "write_line") as write_line:
+        main.main(args + ["message", "AAA", "hello", "world"])
+
+    write_line.assert_called_once_with("LOFUH HMJJX")
+
+
 def test_cli_encrypt_message_key_file(tmpdir, argparse_parse_args_spy):
     p = tmpdir / "test.json"
     p.write_text(
@@ -133,3 +143,91 @@ def test_cli_decrypt_transmission(argparse_parse_args_spy):
 
     main.main(args)
     argparse_parse_args_spy.assert_has_calls([mock.call(args)])
+
+
+def test_cli_encrypt_file(tmpdir):
+    message = "Tomorrow and tomorrow and tomorrow\nCreeps in this petty pace\n" * 50
+    input_file = tmpdir / "in.txt"
+    output_file = tmpdir / "out.txt"
+    input_file.write_text(message, encoding=None)
+    args = [
+        "-n",
+        "I",
+        "VI",
+        "III",
+        "-s",
+        "1",
+        "2",
+        "3",
+        "-r",
+        "B",
+        "-c",
+        "AB HF",
+        "file",
+        "-p",
+        "AMU",
+        "-w",
+        "100",
+        str(input_file),
+        str(output_file),
+    ]
+
+    assert main.main(args) == 0
+
+    enigma = Enigma(["I", "VI", "III"], [1, 2, 3], "B", "AB HF", list("AMU"))
+    expected = "\n".join(enigma.encrypt(line) for line in message.split("\n"))
+    assert output_file.read_text(encoding=None) == expected
+
+
+def test_cli_encrypt_file_key_file(tmpdir):
+    key = tmpdir / "key.json"
+    key.write_text(
+        '{"rotor_names": ["I", "VI", "III"], "ring_settings": [1, 2, 3], '
+        '"reflector_type": "B", "plugboard_connections": "AB HF"}',
+        encoding=None,
+    )
+    message = "Meet at 10:30, gate 4.\n" * 50
+    input_file = tmpdir / "in.txt"
+    output_file = tmpdir / "out.txt"
+    input_file.write_text(message, encoding=None)
+
+    args = ["-k", str(key), "file", "-p", "QRS", str(input_file), str(output_file)]
+    assert main.main(args) == 0
+
+    enigma = Enigma(["I", "VI", "III"], [1, 2, 3], "B", "AB HF", list("QRS"))
+    assert output_file.read_text(encoding=None) == enigma.encrypt(message)
+
+
+def test_cli_encrypt_empty_file(tmpdir):
+    input_file = tmpdir / "in.txt"
+    output_file = tmpdir / "out.txt"
+    input_file.write_text("", encoding=None)
+
+    main.main(
+        ["-n", "I", "II", "III", "-s", "1", "1", "1", "file"]
+        + [str(input_file), str(output_file)]
+    )
+
+    assert output_file.read_text(encoding=None) == ""
+
+
+def test_cli_batch(tmpdir, capsysbinary):
+    p = tmpdir / "jobs.jsonl"
+    p.write_text(
+        '{"rotor_names": ["I", "II", "III"], "ring_settings": [1, 1, 1], '
+        '"reflector_type": "B", "positions": "AAA", "text": "HELLOXWORLD"}\n',
+        encoding=None,
+    )
+
+    assert main.main(["batch", "-j", "1", str(p)]) == 0
+    assert capsysbinary.readouterr().out == b'{"text": "LOFUHZZLZOM"}\n'
+
+
+def test_cli_profile(capsysbinary):
+    args = ["--profile", "-n", "I", "II", "III", "-s", "1", "1", "1", "-r", "B"]
+    assert main.main(args + ["message", "AAA", "HELLO"]) == 0
+
+    err = capsysbinary.readouterr().err.decode()
+    assert "machines.constructed.matrix" in err
+    assert "characters." in err
+    assert "cli.total" in err
@@ -0,0 +1,107 @@
+import pytest
+
+from enigma_simulator import metrics
+from enigma_simulator.engine import CompiledEnigma
+from enigma_simulator.engine import TableEnigma
+from enigma_simulator.enigma import Enigma
+
+
+@pytest.fixture(autouse=True)
+def clean_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+def test_counters_and_timings():
+    metrics.increment("a")
+    metrics.increment("a", 4)
+    metrics.record_time("t", 1e-3)
+    with metrics.timer("t"):
+        pass
+
+    stats = metrics.get_stats()
+    assert stats["counters"] == {"a": 5}
+    assert stats["timings"]["t"]["count"] == 2
+    assert stats["timings"]["t"]["max"] == pytest.approx(1e-3)
+    assert sum(stats["timings"]["t"]["buckets"].values()) == 2
+
+
+def test_histogram_buckets():
+    histogram = metrics.Histogram()
+    histogram.add(3e-6)
+    histogram.add(3e-6)
+    histogram.add(1000.0)
+
+    assert histogram.summary()["buckets"] == {2.0 ** -18: 2, float("inf"): 1}
+
+
+def test_callback():
+    events = []
+    metrics.add_callback(lambda name, value: events.append((name, value)))
+    try:
+        metrics.increment("a", 2)
+        metrics.record_time("t", 0.5)
+    finally:
+        metrics._CALLBACKS.clear()
+
+    assert events == [("a", 2), ("t", 0.5)]
+
+
+def test_remove_callback():
+    events = []
+    metrics.add_callback(events.append)
+    metrics.remove_callback(events.append)
+    metrics.increment("a")
+
+    assert events == []
+
+
+def test_engines_are_instrumented():
+    enigma = Enigma(["I", "II", "III"], [0, 0, 0], "B", "", "AAA", "vectorized")
+    enigma.encrypt("HELLO")
+    enigma.encrypt("WORLD!")
+    TableEnigma.from_settings(["I", "II", "III"], [0, 0, 0], "B").encrypt("ABC")
+    enigma.backend = "matrix"
+    enigma.encrypt("AB")
+
+    stats = metrics.get_stats()
+    core_lookups = [
+        stats["counters"].pop(f"cache.scrambler_core.{i}", 0) for i in ("hit", "miss")
+    ]
+    assert sum(core_lookups) == 2
+    assert stats["counters"] == {
+        "cache.compiled.hit": 1,
+        "cache.compiled.miss": 1,
+        "characters.matrix": 2,
+        "characters.table": 3,
+        "characters.vectorized": 11,
+        "machines.constructed.matrix": 1,
+        "machines.constructed.table": 1,
+        "machines.constructed.vectorized": 1,
+    }
+    assert set(stats["timings"]) == {
+        "construct.matrix",
+        "construct.table",
+        "construct.vectorized",
+        "encrypt.matrix",
+        "encrypt.table",
+        "encrypt.vectorized",
+    }
+
+
+def test_format_stats():
+    metrics.increment("characters.table", 1234)
+    metrics.record_time("encrypt.table", 0.002)
+
+    lines = metrics.format_stats().splitlines()
+
+    assert lines[0].split() == ["characters.table", "1,234"]
+    assert lines[1].split()[:3] == ["encrypt.table", "1", "calls"]
+
+
+def test_construction_does_not_print(capsys):
+    Enigma(["I", "II", "III"], [0, 0, 0], "B", "", "AAA")
+    CompiledEnigma.from_settings(["I", "II", "III"], [0, 0, 0], "B")
+
+    assert capsys.readouterr().out == ""
@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+
+from enigma_simulator.engine import CompiledEnigma
+from enigma_simulator.keyspace import POSITIONS
+from enigma_simulator.positions import decrypt_all_positions
+from enigma_simulator.positions import iter_position_blocks
+from enigma_simulator.positions import PositionDecryptor
+from enigma_simulator.positions import search_positions
+from enigma_simulator.stats import text_to_ints
+
+CIPHERTEXT = "QMJIDO MZWZJFJR"
+SETTINGS = (["VI", "II", "VIII"], [3, 7, 11], "C", "AB CD EF")
+
+
+def expected_row(index):
+    machine = CompiledEnigma.from_settings(*SETTINGS)
+    machine.update_rotor_positions(np.unravel_index(index, (26, 26, 26)))
+    return machine.encrypt_ints(text_to_ints(CIPHERTEXT))
+
+
+def test_composite_tables_and_successors():
+    machine = CompiledEnigma.from_settings(*SETTINGS, rotor_positions=(5, 6, 7))
+    tables, successors = machine.composite_tables(), machine.successors()
+    index = 5 * 676 + 6 * 26 + 7
+
+    for scrambler in machine.scramblers(100):
+        index = successors[index]
+        assert (tables[index] == scrambler).all()
+
+
+def test_decrypt_all_positions():
+    machine = CompiledEnigma.from_settings(*SETTINGS)
+
+    decrypted = decrypt_all_positions(machine, CIPHERTEXT)
+
+    assert decrypted.shape == (POSITIONS, 14)
+    assert decrypted.dtype == np.uint8
+    for index in (0, 1, 25, 26 * 26 - 1, 4000, POSITIONS - 1):
+        assert (decrypted[index] == expected_row(index)).all()
+
+
+def test_iter_position_blocks():
+    machine = CompiledEnigma.from_settings(*SETTINGS)
+    expected = decrypt_all_positions(machine, CIPHERTEXT)
+
+    blocks = list(iter_position_blocks(machine, CIPHERTEXT, block_size=5000))
+
+    assert [start for start, _ in blocks] == [0, 5000, 10000, 15000]
+    assert (np.concatenate([block for _, block in blocks]) == expected).all()
+
+
+def test_decrypt_range_into_out():
+    decryptor = PositionDecryptor(
+        CompiledEnigma.from_settings(*SETTINGS), text_to_ints(CIPHERTEXT)
+    )
+    out = np.zeros((10, 14), dtype=np.uint8)
+
+    assert decryptor.decrypt(100, 110, out=out) is out
+    assert (out[3] == expected_row(103)).all()
+
+
+@pytest.mark.parametrize(
+    ("start", "stop", "out"),
+    (
+        pytest.param(5, 4, None, id="reversed range"),
+        pytest.param(0, POSITIONS + 1, None, id="past the end"),
+        pytest.param(0, 10, np.zeros((9, 14), dtype=np.uint8), id="bad out shape"),
+    ),
+)
+def test_decrypt_invalid(start, stop, out):
+    decryptor = PositionDecryptor(CompiledEnigma.from_settings(*SETTINGS), CIPHERTEXT)
+
+    with pytest.raises(ValueError):
+        decryptor.decrypt(start, stop, out=out)
+
+
+def test_search_positions():
+    machine = CompiledEnigma.from_settings(*SETTINGS, rotor_positions="QEV")
+    ciphertext = machine.encrypt("A" * 30)
+
+    result = search_positions(
+        CompiledEnigma.from_settings(*SETTINGS),
+        ciphertext,
+        lambda block: (block == 0).sum(axis=1),
+        block_size=4000,
+    )
+
+    assert result.results[0] == (30, "QEV")
+    assert result.done == POSITIONS
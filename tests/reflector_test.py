@@ -35,9 +35,7 @@ def test_transform(encoding):
         pytest.param("A", "EJMZALYXVBWFCRQUONTSPIKHGD", id="reflector type A"),
         pytest.param("B", "YRUHQSLDPXNGOKMIEBFZCWVJAT", id="reflector type B"),
         pytest.param("C", "FVPJIAOYEDRZXWGCTKUQSBNMHL", id="reflector type C"),
-        pytest.param(
-            "other", "ABCDEFGHIJKLMNOPQRSTUVWXYZ", id="reflector type default"
-        ),
+        pytest.param("I", "ABCDEFGHIJKLMNOPQRSTUVWXYZ", id="reflector type I"),
     ),
 )
 def test_get_reflector(reflector_type, encoding):
@@ -0,0 +1,125 @@
+import json
+
+import numpy as np
+import pydantic
+import pytest
+
+from enigma_simulator.components import get_reflector
+from enigma_simulator.components import get_rotor
+from enigma_simulator.engine import scrambler_core
+from enigma_simulator.engine import transform_to_permutation
+from enigma_simulator.key import EnigmaKey
+from enigma_simulator.key import ReflectorTypeEnum
+from enigma_simulator.key import RotorNameEnum
+from enigma_simulator.registry import REGISTRY
+from enigma_simulator.registry import Registry
+
+
+@pytest.mark.parametrize("rotor_name", list(REGISTRY.rotors))
+@pytest.mark.parametrize("ring_setting", (0, 1, 25))
+def test_compiled_tables_match_rotor(rotor_name, ring_setting):
+    rotor = get_rotor(rotor_name, ring_setting, 0)
+    forward, backward = REGISTRY.rotor(rotor_name).tables(ring_setting)
+
+    for position in range(26):
+        expected = transform_to_permutation(rotor.transforms[position])
+        np.testing.assert_array_equal(forward[position], expected)
+        np.testing.assert_array_equal(backward[position], np.argsort(expected))
+    assert REGISTRY.rotor(rotor_name).turnover_positions == tuple(rotor.notch_positions)
+
+
+def test_enums_are_registered():
+    assert [i.value for i in RotorNameEnum] == list(REGISTRY.rotors)
+    assert [i.value for i in ReflectorTypeEnum] == list(REGISTRY.reflectors)
+    assert RotorNameEnum.one == "I"
+    assert ReflectorTypeEnum.b == "B"
+
+
+def test_keys_accept_registered_names(monkeypatch):
+    key = {"rotor_names": ["I", "II", "IX"], "ring_settings": [0, 0, 0]}
+    with pytest.raises(pydantic.ValidationError):
+        EnigmaKey.parse_obj({**key, "reflector_type": "B"})
+    with pytest.raises(pydantic.ValidationError):
+        EnigmaKey.parse_obj({**key, "rotor_names": ["I", "II", "III"]})
+
+    registry = Registry()
+    registry.register_rotor("IX", "ZYXWVUTSRQPONMLKJIHGFEDCBA", ["C"])
+    monkeypatch.setitem(REGISTRY.rotors, "IX", registry.rotor("IX"))
+
+    assert EnigmaKey.parse_obj({**key, "reflector_type": "B"}).rotor_names == [
+        "I",
+        "II",
+        "IX",
+    ]
+
+
+def test_rotor_transforms_are_cached(monkeypatch):
+    rotor = get_rotor("I", 3, 0)
+    assert np.shares_memory(get_rotor("I", 3, 5).transforms[1], rotor.transforms[1])
+
+    monkeypatch.setattr(REGISTRY, "version", REGISTRY.version + 1)
+    assert not np.shares_memory(get_rotor("I", 3, 0).transforms[1], rotor.transforms[1])
+
+
+def test_unknown_rotor_raises():
+    with pytest.raises(KeyError):
+        get_rotor("IX", 0, 0)
+
+
+def test_unknown_reflector_raises():
+    with pytest.raises(KeyError):
+        get_reflector("other")
+    with pytest.raises(KeyError):
+        scrambler_core(["I", "II", "III"], [0, 0, 0], "other")
+
+
+@pytest.mark.parametrize(
+    ("method", "args"),
+    (
+        pytest.param("register_rotor", ("X", "ABC", ["A"]), id="short encoding"),
+        pytest.param(
+            "register_rotor", ("X", "A" * 26, ["A"]), id="encoding not permutation"
+        ),
+        pytest.param(
+            "register_rotor",
+            ("X", "EKMFLGDQVZNTOWYHXUSPAIBRCJ", ["AB"]),
+            id="bad notch",
+        ),
+        pytest.param(
+            "register_reflector",
+            ("X", "EKMFLGDQVZNTOWYHXUSPAIBRCJ"),
+            id="reflector not involution",
+        ),
+        pytest.param(
+            "register_reflector",
+            ("X", "ABCDEFGHIJKLMNOPQRSTUVWXYZ"),
+            id="reflector with fixed points",
+        ),
+    ),
+)
+def test_validation(method, args):
+    registry = Registry()
+
+    with pytest.raises(RuntimeError):
+        getattr(registry, method)(*args)
+    assert not registry.rotors and not registry.reflectors
+
+
+@pytest.mark.parametrize("file_type", ("json", "yaml"))
+def test_load(tmpdir, file_type):
+    wirings = {
+        "rotors": {
+            "IX": {"encoding": "ZYXWVUTSRQPONMLKJIHGFEDCBA", "notch_positions": ["C"]}
+        },
+        "thin_wheels": {"Delta": {"encoding": "BCDEFGHIJKLMNOPQRSTUVWXYZA"}},
+        "reflectors": {"D": "BADCFEHGJILKNMPORQTSVUXWZY"},
+    }
+    p = tmpdir / f"wirings.{file_type}"
+    p.write_text(json.dumps(wirings), encoding=None)
+
+    registry = Registry()
+    registry.load(str(p))
+
+    assert registry.rotor("IX").turnover_positions == (1,)
+    assert registry.thin_wheels["Delta"].forward[0, 0] == 1
+    assert registry.reflector("D").table[:2].tolist() == [1, 0]
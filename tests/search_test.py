@@ -0,0 +1,117 @@
+from unittest import mock
+
+import numpy as np
+import pytest
+
+from enigma_simulator import search
+from enigma_simulator.search import Progress
+from enigma_simulator.search import ProgressReport
+from enigma_simulator.search import SearchDriver
+from enigma_simulator.search import TopK
+
+
+def test_top_k():
+    top = TopK(3)
+    for i, score in enumerate([5, 1, 7, 3, 7, 2]):
+        top.push(score, f"item{i}")
+
+    assert len(top) == 3
+    assert top.threshold == 5
+    assert top.results() == [(7, "item2"), (7, "item4"), (5, "item0")]
+    assert top.best() == (7, "item2")
+
+
+def test_top_k_push_many_matches_push():
+    scores = np.random.default_rng(0).normal(size=1000)
+    expected, top = TopK(10), TopK(10)
+    for i, score in enumerate(scores):
+        expected.push(score, i)
+
+    top.push_many(scores[:500], range(500))
+    top.push_many(scores[500:], range(500, 1000))
+
+    assert top.results() == expected.results()
+
+
+def test_top_k_must_keep_something():
+    with pytest.raises(ValueError):
+        TopK(0)
+
+
+@pytest.mark.parametrize(
+    ("report", "expected"),
+    (
+        pytest.param(
+            ProgressReport(5000, 20000, 2.0, 2500.0, 6.0),
+            "5,000/20,000 (25.0%) 2,500/s ETA 0:00:06",
+            id="with total",
+        ),
+        pytest.param(
+            ProgressReport(5000, None, 2.0, 2500.0, None),
+            "5,000 2,500/s",
+            id="no total",
+        ),
+    ),
+)
+def test_progress_report_str(report, expected):
+    assert str(report) == expected
+
+
+def test_progress_calls_callback():
+    reports = []
+    progress = Progress(total=100, callback=reports.append, interval=0.0)
+
+    for _ in range(100):
+        progress.update()
+
+    assert reports
+    assert reports[-1].done <= 100
+    assert progress.report().done == 100
+
+
+def test_progress_prints_to_stderr(capsysbinary):
+    progress = Progress(total=10, interval=0.0)
+    progress.update(10)
+
+    assert b"10/10 (100.0%)" in capsysbinary.readouterr().err
+
+
+def test_driver_runs_to_exhaustion():
+    result = SearchDriver(keep=2).run(range(100), lambda x: -abs(x - 42))
+
+    assert result.results == [(0, 42), (-1, 41)]
+    assert result.done == 100
+    assert result.reason == "exhausted"
+
+
+def test_driver_stops_at_threshold():
+    result = SearchDriver(keep=2, threshold=0).run(range(100), lambda x: -abs(x - 42))
+
+    assert result.done == 43
+    assert result.reason == "threshold"
+
+
+def test_driver_stops_on_time_budget():
+    with mock.patch.object(search.time, "monotonic", side_effect=range(1000)):
+        driver: SearchDriver[int] = SearchDriver(time_budget=10)
+        result = driver.run(range(1000), float)
+
+    assert result.reason == "time"
+    assert 0 < result.done < 1000
+
+
+def test_driver_keeps_results_on_ctrl_c():
+    def score(x):
+        if x == 50:
+            raise KeyboardInterrupt
+        return float(x)
+
+    result = SearchDriver(keep=1).run(range(100), score)
+
+    assert result.results == [(49.0, 49)]
+    assert result.reason == "interrupted"
+
+
+def test_driver_does_not_swallow_other_errors():
+    with pytest.raises(ZeroDivisionError):
+        SearchDriver().run(range(10), lambda x: 1 / (x - 5))
@@ -0,0 +1,116 @@
+import copy
+import gc
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pytest
+
+from enigma_simulator import shared
+from enigma_simulator.engine import CompiledEnigma
+from enigma_simulator.engine import ProcessEnigma
+from enigma_simulator.engine import ScramblerCore
+
+pytestmark = pytest.mark.skipif(
+    not shared.AVAILABLE, reason="shared memory needs python 3.8+"
+)
+
+
+def new_core():
+    # Not from the scrambler core cache, so publishing it doesn't leak into other
+    # tests.
+    machine = CompiledEnigma.from_settings(["I", "II", "III"], [1, 2, 3], "B")
+    return ScramblerCore(
+        machine.forward.copy(), machine.reflector.copy(), machine.notches.copy()
+    )
+
+
+def test_publish_and_attach():
+    arrays = {"a": np.arange(10, dtype=np.uint8), "b": np.ones((3, 5))}
+    handle = shared.REGISTRY.publish(arrays)
+    try:
+        views = shared.attach(handle)
+
+        assert handle.segment in shared.REGISTRY
+        assert (views["a"] == arrays["a"]).all()
+        assert (views["b"] == arrays["b"]).all()
+        assert all(v.ctypes.data % shared.ALIGNMENT == 0 for v in views.values())
+        with pytest.raises(ValueError):
+            views["a"][0] = 1
+    finally:
+        shared.REGISTRY.unpublish(handle.segment)
+
+    assert handle.segment not in shared.REGISTRY
+
+
+def test_published_core_pickles_as_handle():
+    core = new_core()
+    full = pickle.dumps(core)
+
+    handle = shared.publish_core(core, composite=True)
+    published = pickle.dumps(core)
+    copy = pickle.loads(published)
+
+    assert handle is not None
+    assert len(published) < len(full) < len(pickle.dumps(core.composite_tables()))
+    assert copy.handle == handle
+    assert (copy.composite_tables() == core.composite_tables()).all()
+    assert (copy.successors() == core.successors()).all()
+    assert shared.publish_core(core) is handle
+
+
+def _composite_checksum(machine):
+    return int(machine.composite_tables().sum()), machine.core.handle.segment
+
+
+def test_workers_attach_to_published_tables():
+    machine = CompiledEnigma(new_core(), np.arange(26, dtype=np.uint8))
+    handle = shared.publish_core(machine.core, composite=True)
+
+    with ProcessPoolExecutor(2) as executor:
+        results = list(executor.map(_composite_checksum, [machine] * 4))
+
+    assert results == [(int(machine.composite_tables().sum()), handle.segment)] * 4
+
+
+def test_segment_is_unlinked_with_core():
+    core = new_core()
+    handle = shared.publish_core(core)
+    assert handle.segment in shared.REGISTRY
+
+    del core
+    gc.collect()
+
+    assert handle.segment not in shared.REGISTRY
+    with pytest.raises(FileNotFoundError):
+        shared.attach(handle)
+
+
+def test_process_segments_pickle_as_handle():
+    machine = ProcessEnigma.from_settings(["I", "II", "III"], [1, 2, 3], "B", "AB CD")
+    whole = len(pickle.dumps(machine))
+    handle = shared.publish_core(machine.core)
+
+    segment = copy.copy(machine)
+    copy_of_segment = pickle.loads(pickle.dumps(segment))
+
+    assert len(pickle.dumps(segment)) < whole // 4
+    assert copy_of_segment.core.handle == handle
+    assert not copy_of_segment.forward.flags.owndata
+    assert copy_of_segment.encrypt("HELLOWORLD") == machine.encrypt("HELLOWORLD")
+
+
+def test_attached_segments_are_bounded(monkeypatch):
+    monkeypatch.setattr(shared, "MAX_ATTACHED", 2)
+    cores = [new_core() for _ in range(3)]
+    handles = [shared.publish_core(core) for core in cores]
+
+    for handle in handles:
+        shared.attach_core(handle)
+    gc.collect()
+    shared.detach(handles[1].segment)
+
+    assert list(shared._ATTACHED) == [handles[2].segment]
+    assert list(shared._CORES) == [handles[2].segment]
+    assert shared._DETACHED == []
+    shared.detach_all()
@@ -0,0 +1,160 @@
+import math
+
+import numpy as np
+import pytest
+
+from enigma_simulator import solver
+from enigma_simulator.engine import CompiledEnigma
+from enigma_simulator.key import EnigmaKey
+from enigma_simulator.solver import NgramScorer
+from enigma_simulator.solver import Schedule
+from enigma_simulator.solver import solve
+from enigma_simulator.solver import State
+from enigma_simulator.stats import text_to_ints
+
+PLAINTEXT = (
+    "ALL THE WORLDS A STAGE AND ALL THE MEN AND WOMEN MERELY PLAYERS THEY HAVE "
+    "THEIR EXITS AND THEIR ENTRANCES AND ONE MAN IN HIS TIME PLAYS MANY PARTS HIS "
+    "ACTS BEING SEVEN AGES AT FIRST THE INFANT MEWLING AND PUKING IN THE NURSES "
+    "ARMS AND THEN THE WHINING SCHOOLBOY WITH HIS SATCHEL AND SHINING MORNING FACE"
+)
+
+
+def test_ngram_scorer_prefers_plaintext():
+    scorer = NgramScorer.from_text(PLAINTEXT)
+    ints = text_to_ints(PLAINTEXT)
+    shuffled = np.random.default_rng(0).permutation(ints)
+
+    assert scorer.n == 3
+    assert scorer(ints) > scorer(shuffled)
+    assert scorer(ints[:2]) == 0.0
+
+
+def test_ngram_scorer_load(tmp_path):
+    path = tmp_path / "bigrams.txt"
+    path.write_text("TH 10\nhe 5\n")
+    scorer = NgramScorer.load(str(path))
+
+    assert scorer.n == 2
+    assert scorer(text_to_ints("TH")) > scorer(text_to_ints("HE"))
+    assert scorer(text_to_ints("HE")) > scorer(text_to_ints("QZ"))
+
+
+@pytest.mark.parametrize("kind", ("exponential", "linear"))
+def test_schedule(kind):
+    schedule = Schedule(10.0, 1.0, kind)
+
+    assert schedule.temperature(0) == pytest.approx(10.0)
+    assert schedule.temperature(1) == pytest.approx(1.0)
+    assert 1.0 < schedule.temperature(0.5) < 10.0
+
+
+def test_move_plugboard_keeps_an_involution():
+    rng = np.random.default_rng(0)
+    plugboard = np.arange(26, dtype=np.uint8)
+
+    for _ in range(500):
+        plugboard = solver.move_plugboard(rng, plugboard, 10)
+        assert (plugboard[plugboard] == np.arange(26)).all()
+        assert (plugboard != np.arange(26)).sum() <= 20
+
+
+def test_anneal_recovers_plugboard():
+    key_settings = (("II", "IV", "V"), (1, 2, 3), (10, 20, 5))
+    connections = "AQ BT EZ"
+    ciphertext = CompiledEnigma.from_settings(
+        key_settings[0], key_settings[1], "B", connections, key_settings[2]
+    ).encrypt_ints(text_to_ints(PLAINTEXT))
+
+    solver._init(
+        ciphertext,
+        NgramScorer.from_text(PLAINTEXT),
+        {
+            "reflector_type": "B",
+            "rotor_names": ["II", "IV", "V"],
+            "schedule": Schedule(2.0, 0.1),
+            "total_iterations": 3000,
+            "plugs": 3,
+            "plugboard_move_rate": 1.0,
+        },
+    )
+    start = State(*key_settings, np.arange(26, dtype=np.uint8))
+    _, _, best, _ = solver._anneal(start, 0, 0, 3000, float("inf"))
+
+    assert best.plugboard_connections == connections
+
+
+@pytest.mark.parametrize("islands", (1, 2))
+def test_solve(islands):
+    ciphertext = CompiledEnigma.from_settings(
+        ["I", "II", "III"], [0, 0, 0], "B", "AB"
+    ).encrypt(PLAINTEXT)
+    scorer = NgramScorer.from_text(PLAINTEXT)
+
+    result = solve(
+        ciphertext, scorer, islands=islands, epochs=2, iterations=20, plugs=2, seed=1
+    )
+
+    assert isinstance(result.key, EnigmaKey)
+    assert len(result.positions) == 3
+    machine = CompiledEnigma.from_key(result.key, result.positions)
+    assert machine.encrypt(ciphertext.replace(" ", "")) == result.plaintext
+    assert scorer(text_to_ints(result.plaintext)) == pytest.approx(result.score)
+
+
+def test_solve_respects_time_budget():
+    ciphertext = CompiledEnigma.from_settings(
+        ["I", "II", "III"], [0, 0, 0], "B"
+    ).encrypt(PLAINTEXT)
+
+    result = solve(
+        ciphertext, NgramScorer.from_text(PLAINTEXT), epochs=1000, time_budget=0.0
+    )
+
+    assert len(result.plaintext) == len(text_to_ints(ciphertext))
+
+
+def test_solve_stops_at_threshold():
+    ciphertext = CompiledEnigma.from_settings(
+        ["I", "II", "III"], [0, 0, 0], "B"
+    ).encrypt(PLAINTEXT)
+    result = solve(
+        ciphertext,
+        NgramScorer.from_text(PLAINTEXT),
+        epochs=1000,
+        iterations=5,
+        threshold=-math.inf,
+    )
+
+    assert len(result.plaintext) == len(text_to_ints(ciphertext))
+
+
+@pytest.mark.parametrize("islands", (1, 2))
+def test_solve_reports_within_epochs(monkeypatch, islands):
+    ciphertext = CompiledEnigma.from_settings(
+        ["I", "II", "III"], [0, 0, 0], "B"
+    ).encrypt(PLAINTEXT)
+    recorded = []
+    record = solver.SearchDriver.record
+
+    def spy(self, score, item, n=1):
+        recorded.append(n)
+        return record(self, score, item, n)
+
+    monkeypatch.setattr(solver.SearchDriver, "record", spy)
+    solve(ciphertext, NgramScorer.from_text(PLAINTEXT), islands=islands, epochs=1)
+
+    assert len(recorded) >= islands * 2000 // solver.REPORT_STRIDE
+    assert sum(recorded) == islands * 2000
+
+    # A single huge epoch still stops as soon as the threshold is reached.
+    recorded.clear()
+    solve(
+        ciphertext,
+        NgramScorer.from_text(PLAINTEXT),
+        islands=islands,
+        epochs=1,
+        iterations=10 ** 9,
+        threshold=-math.inf,
+    )
+    assert sum(recorded) < 10 ** 6
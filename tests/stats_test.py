@@ -0,0 +1,82 @@
+import json
+
+import numpy as np
+import pytest
+
+from enigma_simulator.enigma import Enigma
+from enigma_simulator.stats import corpus_stats
+from enigma_simulator.stats import CorpusStats
+from enigma_simulator.stats import index_of_coincidence
+from enigma_simulator.stats import letter_counts
+from enigma_simulator.stats import text_to_ints
+from enigma_simulator.utils import char_to_int
+
+PLAINTEXT = (
+    "Tomorrow and tomorrow and tomorrow Creeps in this petty pace from day to day "
+    "To the last syllable of recorded time And all our yesterdays have lighted "
+    "fools The way to dusty death Out out brief candle"
+)
+
+
+def test_text_to_ints_matches_char_to_int():
+    text = "Hello, World! [az] @`{"
+    expected = [char_to_int(c) for c in text if c.isalpha()]
+
+    assert text_to_ints(text).tolist() == expected
+    assert text_to_ints(text.encode()).tolist() == expected
+
+
+def test_letter_counts():
+    counts = letter_counts(["AAB", "", "zz"])
+
+    assert counts.shape == (3, 26)
+    assert counts[0, :2].tolist() == [2, 1]
+    assert counts[1].sum() == 0
+    assert counts[2, 25] == 2
+
+
+@pytest.mark.parametrize(
+    ("counts", "expected"),
+    (
+        pytest.param([4] + [0] * 25, 1.0, id="single letter"),
+        pytest.param([1] * 26, 0.0, id="all distinct"),
+    ),
+)
+def test_index_of_coincidence(counts, expected):
+    assert index_of_coincidence(np.array(counts)) == expected
+
+
+def test_corpus_stats(tmpdir):
+    ciphertext = Enigma(["I", "II", "III"], [1, 1, 1], "B", "", [0, 0, 0]).encrypt(
+        PLAINTEXT
+    )
+
+    (tmpdir / "plain.txt").write_text(PLAINTEXT, encoding=None)
+    with open(tmpdir / "messages.jsonl", "w") as f:
+        f.write(json.dumps({"id": "cipher", "text": ciphertext}) + "\n")
+        f.write(json.dumps("AAAA") + "\n")
+
+    stats = corpus_stats(str(tmpdir), workers=2)
+
+    assert stats.names.tolist() == [
+        "cipher",
+        f"{tmpdir / 'messages.jsonl'}:2",
+        str(tmpdir / "plain.txt"),
+    ]
+    assert stats.lengths.tolist() == [164, 4, 164]
+    assert stats.index_of_coincidence[1] == 1.0
+    assert stats.chi_squared[0] > stats.chi_squared[2]
+
+    aggregate = stats.aggregate()
+    assert aggregate["messages"] == 3
+    assert aggregate["letters"] == stats.lengths.sum()
+
+
+def test_save_and_load(tmpdir):
+    stats = CorpusStats.from_counts(["a", "b"], letter_counts(["HELLO", "WORLD"]))
+    path = str(tmpdir / "stats.npz")
+    stats.save(path)
+    loaded = CorpusStats.load(path)
+
+    for field in CorpusStats._fields:
+        np.testing.assert_array_equal(getattr(loaded, field), getattr(stats, field))
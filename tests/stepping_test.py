@@ -0,0 +1,62 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from enigma_simulator.engine import CompiledEnigma
+from enigma_simulator.stepping import position_index
+from enigma_simulator.stepping import step_schedule
+from enigma_simulator.stepping import StepSchedule
+
+
+def walk(schedule, start, n):
+    positions = []
+    for _ in range(n):
+        start = int(schedule.successors[start])
+        positions.append(start)
+    return positions
+
+
+@pytest.mark.parametrize(
+    "notches, period", ((([4], [21]), 16900), (([12, 25], [12, 25]), 4056))
+)
+def test_period(notches, period):
+    schedule = StepSchedule(*notches)
+
+    assert schedule.period(0) == period
+    assert walk(schedule, 0, period + 1)[-1] == int(schedule.successors[0])
+
+
+@pytest.mark.parametrize("notches", (([4], [21]), ([12, 25], [12, 25]), ([], [])))
+def test_indices_match_successors(notches):
+    schedule = StepSchedule(*notches)
+    rng = np.random.default_rng(0)
+    # Includes positions that aren't on a cycle, e.g. a middle rotor at its notch.
+    starts = [0, position_index((0, 4, 0)), position_index((7, 12, 25))]
+    starts += rng.integers(0, 26 ** 3, size=5).tolist()
+
+    for start in starts:
+        for n in (0, 1, 30, 20000):
+            assert schedule.indices(start, n).tolist() == walk(schedule, start, n)
+
+
+def test_positions():
+    # The double step of rotors I, II, III: ADU, ADV, AEW, BFX.
+    schedule = step_schedule([4], [21])
+    lefts, middles, rights = schedule.positions((0, 3, 20), 3)
+
+    assert lefts.tolist() == [0, 0, 1]
+    assert middles.tolist() == [3, 4, 5]
+    assert rights.tolist() == [21, 22, 23]
+    assert lefts.dtype == middles.dtype == rights.dtype == np.uint8
+
+
+def test_shared_by_machines_with_the_same_notches():
+    a = CompiledEnigma.from_settings(["I", "II", "III"], [0, 0, 0], "B")
+    b = CompiledEnigma.from_settings(["IV", "II", "III"], [5, 9, 1], "C")
+    c = CompiledEnigma.from_settings(["I", "III", "II"], [0, 0, 0], "B")
+
+    assert a.core.schedule() is b.core.schedule()
+    assert a.core.schedule() is not c.core.schedule()
+    assert step_schedule((4,), [21]) is a.core.schedule()
+    assert pickle.loads(pickle.dumps(a.core.schedule())) is a.core.schedule()
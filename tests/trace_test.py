@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+from enigma_simulator.engine import CompiledEnigma
+from enigma_simulator.engine import TableEnigma
+from enigma_simulator.enigma import Enigma
+from enigma_simulator.trace import STAGES
+from enigma_simulator.trace import Trace
+from enigma_simulator.utils import char_to_int
+
+
+def enigma(backend):
+    # Middle rotor one before its notch, so the trace covers a double step.
+    return Enigma(["I", "II", "III"], [0, 0, 0], "B", "AB CD", "ADU", backend)
+
+
+@pytest.mark.parametrize("backend", ("table", "vectorized", "process"))
+def test_compiled_trace_matches_reference(backend):
+    reference, machine = enigma("matrix"), enigma(backend)
+    reference.trace, machine.trace = Trace(), Trace()
+
+    assert machine.encrypt("HELLOWORLD") == reference.encrypt("HELLOWORLD")
+    assert (machine.trace.positions == reference.trace.positions).all()
+    assert (machine.trace.letters == reference.trace.letters).all()
+
+
+def test_trace_contents():
+    machine = enigma("vectorized")
+    machine.trace = Trace()
+
+    encrypted = machine.encrypt("AAAA")
+
+    trace = machine.trace
+    assert len(trace) == 4
+    assert trace.positions.dtype == np.uint8
+    assert [i.tolist() for i in trace.positions[:3]] == [
+        [0, 3, 21],
+        [0, 4, 22],
+        [1, 5, 23],
+    ]
+    assert (trace.letters[:, 0] == 0).all()
+    assert (trace.letters[:, 1] == 1).all()
+    assert trace.letters[:, STAGES.index("output")].tolist() == [
+        char_to_int(c) for c in encrypted
+    ]
+
+
+def test_trace_grows():
+    machine = CompiledEnigma.from_settings(["I", "II", "III"], [0, 0, 0], "B")
+    machine.trace = Trace(capacity=3)
+
+    machine.encrypt("ABCDE")
+    machine.encrypt("FGHIJ")
+
+    assert len(machine.trace) == 10
+    assert machine.trace.letters[:, 0].tolist() == list(range(10))
+
+
+def test_no_trace_by_default():
+    machine = TableEnigma.from_settings(["I", "II", "III"], [0, 0, 0], "B")
+
+    assert machine.trace is None
+    assert enigma("matrix").trace is None
+
+
+def test_save(tmp_path):
+    machine = CompiledEnigma.from_settings(["I", "II", "III"], [0, 0, 0], "B")
+    machine.trace = Trace()
+    machine.encrypt("AB")
+
+    machine.trace.save(str(tmp_path / "trace.npy"))
+    machine.trace.save(str(tmp_path / "trace.csv"))
+
+    array = np.load(tmp_path / "trace.npy")
+    assert array.shape == (2, 13)
+    assert array.dtype == np.uint8
+    lines = (tmp_path / "trace.csv").read_text().splitlines()
+    assert lines[0] == "left,middle,right," + ",".join(STAGES)
+    assert lines[1].startswith("A,A,B,A,A,")
+    with pytest.raises(NotImplementedError):
+        machine.trace.save(str(tmp_path / "trace.txt"))
+
+
+def test_clear():
+    trace = Trace()
+    trace.allocate(5)
+    trace.clear()
+
+    assert len(trace) == 0